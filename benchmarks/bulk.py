@@ -0,0 +1,63 @@
+"""
+Benchmark of the creation of many instances of generated classes, with and without bulk factories.
+
+Generates the library example metamodel with bulk factories and times the creation of books by
+their constructor and by `create_many`, with and without notifications, in a new interpreter::
+
+    $ python benchmarks/bulk.py
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from pyecore.resources import ResourceSet, URI
+from pyecoregen.ecore import EcoreGenerator
+
+LIBRARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'tests',
+                            'input', 'library.ecore')
+
+# Creates books in each mode and prints the seconds per created book:
+MEASUREMENT = '''
+import sys, time
+import library
+
+count = int(sys.argv[1])
+rows = [('book{}'.format(i), i, library.BookCategory.Mistery, None) for i in range(count)]
+
+start = time.perf_counter()
+books = [library.Book(title=t, pages=p, category=c, authors=a) for t, p, c, a in rows]
+constructor = time.perf_counter() - start
+
+start = time.perf_counter()
+library.Book.create_many(rows)
+bulk = time.perf_counter() - start
+
+start = time.perf_counter()
+library.Book.create_many(rows, notify=False)
+silent = time.perf_counter() - start
+print(constructor / count, bulk / count, silent / count)
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--count', type=int, default=50000, help='Number of created books.')
+    args = parser.parse_args()
+
+    model = ResourceSet().get_resource(URI(LIBRARY_PATH)).contents[0]
+
+    with tempfile.TemporaryDirectory() as folder:
+        EcoreGenerator(bulk_factories=True).generate(model, folder)
+        output = subprocess.check_output([sys.executable, '-c', MEASUREMENT, str(args.count)],
+                                         cwd=folder)
+
+    print('{:>24} {:>12}'.format('mode', 'book [us]'))
+    for mode, seconds in zip(('constructor', 'create_many', 'create_many(notify=False)'),
+                             output.split()):
+        print('{:>24} {:>12.2f}'.format(mode, float(seconds) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark of ordering the classes of a package by inheritance.
+
+Orders the classes of packages with an increasing number of classes in deep inheritance chains
+with diamonds, with the topological sort of the module task and, for comparison, with the previous
+sort by number of all supertypes. With linear scaling, the time per class stays roughly constant::
+
+    $ python benchmarks/classes.py
+"""
+import argparse
+import time
+
+from pyecore import ecore
+from pyecoregen.ecore import EcorePackageModuleTask
+
+
+def create_package(classes, depth):
+    """
+    Returns package with given number of classes in inheritance chains of given length.
+
+    Each class inherits from the previous class of its chain and from the class before that, so
+    the chains consist of diamonds. The classes are stored in reverse, subclasses first.
+    """
+    package = ecore.EPackage('classes')
+    eclasses = []
+    for i in range(classes):
+        eclass = ecore.EClass('Class{}'.format(i))
+        position = i % depth
+        if position:
+            eclass.eSuperTypes.append(eclasses[i - 1])
+        if position > 1:
+            eclass.eSuperTypes.append(eclasses[i - 2])
+        eclasses.append(eclass)
+    package.eClassifiers.extend(reversed(eclasses))
+    return package
+
+
+def by_supertype_count(package):
+    """Previous ordering, sorting classes by the number of all their supertypes."""
+    classes = (c for c in package.eClassifiers if isinstance(c, ecore.EClass))
+    return sorted(classes, key=lambda c: len(set(c.eAllSuperTypes())))
+
+
+ORDERINGS = [
+    ('topological', EcorePackageModuleTask.classes),
+    ('count', by_supertype_count),
+]
+
+
+def time_ordering(ordering, package, repeat):
+    """Returns best time of ordering the classes of package."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ordering(package)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 2000, 4000, 8000])
+    parser.add_argument('--depth', type=int, default=12)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print('{:>8} {:>14} {:>12} {:>16}'.format('classes', 'ordering', 'time [s]',
+                                              'per class [us]'))
+    for classes in args.sizes:
+        package = create_package(classes, args.depth)
+        for name, ordering in ORDERINGS:
+            seconds = time_ordering(ordering, package, args.repeat)
+            print('{:>8} {:>14} {:>12.4f} {:>16.2f}'.format(classes, name, seconds,
+                                                            seconds / classes * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+Benchmark of code generation from synthetic metamodels of configurable size.
+
+Generates code for the scenarios defined in `SCENARIOS` and times each phase of the generation
+separately. The timings are compared against the baselines stored in `baselines.json`, a phase
+that is more than `--tolerance` slower than its baseline is reported as regression::
+
+    $ python benchmarks/generation.py --scenario large --save
+    $ python benchmarks/generation.py --scenario large
+
+Timings depend on the machine, so baselines are only comparable if recorded on the same machine.
+They are therefore not part of the repository: record them with `--save` before a change and
+compare after it, refresh them after intended changes in performance.
+"""
+import argparse
+import collections
+import json
+import os
+import sys
+import tempfile
+
+from pyecoregen.ecore import EcoreGenerator
+from synthetic import create_metamodel, load_metamodel, save_metamodel
+
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+
+# Parameters of the synthetic metamodels, see `synthetic.create_metamodel`:
+SCENARIOS = collections.OrderedDict([
+    ('small', dict(packages=2, classes=20, depth=2, opposites=10)),
+    ('medium', dict(packages=5, classes=100, depth=5, opposites=50)),
+    ('large', dict(packages=10, classes=300, depth=10, opposites=200)),
+    ('deep', dict(packages=1, classes=300, depth=300, opposites=0)),
+    ('opposites', dict(packages=1, classes=100, depth=1, opposites=2000)),
+])
+
+# Phases recorded in the profile of `EcoreGenerator.generate`, plus loading the metamodel:
+PHASES = ('load', 'dependencies', 'index', 'templates', 'context', 'render', 'format', 'write')
+
+# Slowdown in seconds always considered as noise, as very short phases vary a lot relatively:
+NOISE = 0.01
+
+
+def generate_phases(path, outfolder, formatter):
+    """
+    Generates code for metamodel stored in file and its dependencies, timing each phase.
+
+    The code is generated by `EcoreGenerator.generate`, the durations are read from the
+    generator's profile, summed over all tasks and packages.
+
+    Returns:
+        Tuple of a mapping of phase name to duration in seconds and the number of written files.
+    """
+    generator = EcoreGenerator(with_dependencies=True, formatter=formatter)
+    with generator.profile.measure('load'):
+        model = load_metamodel(path)
+    generator.generate(model, outfolder)
+
+    phases = generator.profile.report()['phases']
+    timings = collections.OrderedDict((p, phases.get(p, 0.0)) for p in PHASES)
+    return timings, len(generator.writer.written)
+
+
+def run_scenario(parameters, formatter, repeat):
+    """Returns best timing of each phase and the number of generated files for scenario."""
+    best = {}
+    with tempfile.TemporaryDirectory() as folder:
+        paths = save_metamodel(create_metamodel(**parameters), folder)
+        for i in range(repeat):
+            # each run loads the metamodel into a new resource set:
+            outfolder = os.path.join(folder, 'output{}'.format(i))
+            timings, files = generate_phases(paths[-1], outfolder, formatter)
+            for phase, seconds in timings.items():
+                best[phase] = round(min(seconds, best.get(phase, seconds)), 4)
+    return best, files
+
+
+def load_baselines():
+    try:
+        with open(BASELINES_PATH) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baselines(baselines):
+    with open(BASELINES_PATH, 'w') as file:
+        json.dump(baselines, file, indent=2, sort_keys=True)
+        file.write('\n')
+
+
+def compare(result, baseline, tolerance):
+    """Returns list of regressions of result compared to baseline, as printable strings."""
+    regressions = []
+    if result['files'] != baseline['files']:
+        regressions.append('generated {} instead of {} files'.format(
+            result['files'], baseline['files']))
+    for phase in PHASES:
+        if phase not in baseline['timings']:
+            continue
+        seconds, expected = result['timings'][phase], baseline['timings'][phase]
+        if seconds > expected * (1 + tolerance) + NOISE:
+            regressions.append('{} took {:.4f}s instead of {:.4f}s'.format(phase, seconds,
+                                                                           expected))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scenario', choices=list(SCENARIOS), nargs='+',
+                        default=['small', 'medium'])
+    parser.add_argument('--formatter', default='autopep8')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='Relative slowdown of a phase reported as regression.')
+    parser.add_argument('--save', action='store_true', help='Store results as new baselines.')
+    args = parser.parse_args()
+
+    baselines = load_baselines()
+    failed = False
+
+    print('{:<20} {:>6} '.format('scenario', 'files') +
+          ' '.join('{:>12}'.format(p) for p in PHASES))
+    for name in args.scenario:
+        timings, files = run_scenario(SCENARIOS[name], args.formatter, args.repeat)
+        key = '{}/{}'.format(name, args.formatter)
+        result = dict(files=files, timings=timings)
+        print('{:<20} {:>6} '.format(key, files) +
+              ' '.join('{:>12.4f}'.format(timings[p]) for p in PHASES))
+
+        if args.save:
+            baselines[key] = result
+        elif key in baselines:
+            for regression in compare(result, baselines[key], args.tolerance):
+                print('  regression: {}'.format(regression))
+                failed = True
+
+    if args.save:
+        save_baselines(baselines)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+Benchmark of importing generated packages, with and without lazy imports.
+
+Generates a package with many subpackages in both modes and measures the time of importing the
+root package and of using a single class of it, each in a new interpreter::
+
+    $ python benchmarks/imports.py
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from pyecoregen.ecore import EcoreGenerator
+from synthetic import create_package_tree
+
+STATEMENTS = [
+    ('import', 'import tree'),
+    ('use', 'import tree; tree.Root(first=tree.pkg0.Pkg0Class0())'),
+]
+
+
+def time_import(folder, statement, repeat):
+    """Returns best time of running statement in a new interpreter, including its startup."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.check_call([sys.executable, '-c', statement], cwd=folder)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--subpackages', type=int, default=50)
+    parser.add_argument('--classes', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    package = create_package_tree(args.subpackages, args.classes)
+    baseline = time_import('.', 'pass', args.repeat)
+
+    print('{:>8} {:>10} {:>10}'.format('mode', *(name for name, _ in STATEMENTS)))
+    with tempfile.TemporaryDirectory() as folder:
+        for lazy_imports in (False, True):
+            outfolder = os.path.join(folder, str(lazy_imports))
+            EcoreGenerator(formatter='fast', lazy_imports=lazy_imports).generate(package, outfolder)
+            timings = [time_import(outfolder, statement, args.repeat) - baseline
+                       for _, statement in STATEMENTS]
+            print('{:>8} {:>10.4f} {:>10.4f}'.format('lazy' if lazy_imports else 'eager', *timings))
+
+
+if __name__ == '__main__':
+    main()
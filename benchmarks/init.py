@@ -0,0 +1,65 @@
+"""
+Benchmark of the creation of instances of generated classes, with and without flat constructors.
+
+Generates a package with a single inheritance chain of each given depth in both modes and times
+the creation of instances of the deepest class, with all features set, each in a new
+interpreter::
+
+    $ python benchmarks/init.py
+    $ python benchmarks/init.py --depth 1 10 50
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from pyecoregen.ecore import EcoreGenerator
+from synthetic import create_package
+
+# Creates instances of the deepest class and prints the seconds per created instance:
+MEASUREMENT = '''
+import sys, time
+import pkg0
+
+depth, count = int(sys.argv[1]), int(sys.argv[2])
+eclass = getattr(pkg0, 'Pkg0Class{}'.format(depth - 1))
+kwargs = {}
+for i in range(depth):
+    kwargs['name{}'.format(i)] = 'name'
+    kwargs['values{}'.format(i)] = [1, 2]
+
+start = time.perf_counter()
+for _ in range(count):
+    eclass(**kwargs)
+print((time.perf_counter() - start) / count)
+'''
+
+
+def measure(folder, depth, count):
+    """Returns seconds per created instance of the generated package in folder."""
+    output = subprocess.check_output([sys.executable, '-c', MEASUREMENT, str(depth), str(count)],
+                                     cwd=folder)
+    return float(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--depth', type=int, nargs='+', default=[1, 5, 10, 20])
+    parser.add_argument('--count', type=int, default=5000, help='Number of created instances.')
+    args = parser.parse_args()
+
+    print('{:>6} {:>14} {:>14}'.format('depth', 'chained [us]', 'flat [us]'))
+    with tempfile.TemporaryDirectory() as folder:
+        for depth in args.depth:
+            model = create_package(0, classes=depth, depth=depth, opposites=0)
+            timings = []
+            for flat_init in (False, True):
+                outfolder = os.path.join(folder, '{}-{}'.format(depth, flat_init))
+                EcoreGenerator(flat_init=flat_init).generate(model, outfolder)
+                timings.append(measure(outfolder, depth, args.count))
+            print('{:>6} {:>14.2f} {:>14.2f}'.format(depth, *(t * 1e6 for t in timings)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark of the memory used by instances of generated classes, with and without compact classes.
+
+Generates the library example metamodel in both modes and measures the memory allocated per
+instance of a populated library model, each in a new interpreter::
+
+    $ python benchmarks/memory.py
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from pyecore.resources import ResourceSet, URI
+from pyecoregen.ecore import EcoreGenerator
+
+LIBRARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'tests',
+                            'input', 'library.ecore')
+
+# Creates a library with books and writers and prints the allocated bytes per created object:
+MEASUREMENT = '''
+import sys, time, tracemalloc
+import library
+
+count = int(sys.argv[1])
+tracemalloc.start()
+lib = library.Library(name='library')
+for i in range(count):
+    writer = library.Writer(name='writer{}'.format(i))
+    book = library.Book(title='book{}'.format(i), pages=i, category=library.BookCategory.Mistery)
+    book.authors.append(writer)
+    lib.books.append(book)
+    lib.writers.append(writer)
+memory = tracemalloc.get_traced_memory()[0]
+tracemalloc.stop()
+
+start = time.perf_counter()
+for book in lib.books:
+    book.pages += 1
+print(memory / (2 * count), (time.perf_counter() - start) / count)
+'''
+
+
+def measure(folder, count):
+    """Returns bytes per instance and seconds per attribute update of the library in folder."""
+    output = subprocess.check_output([sys.executable, '-c', MEASUREMENT, str(count)], cwd=folder)
+    return [float(v) for v in output.split()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--count', type=int, default=20000, help='Number of books and writers.')
+    args = parser.parse_args()
+
+    model = ResourceSet().get_resource(URI(LIBRARY_PATH)).contents[0]
+
+    print('{:>8} {:>16} {:>16}'.format('mode', 'bytes/instance', 'update [us]'))
+    with tempfile.TemporaryDirectory() as folder:
+        for compact_classes in (False, True):
+            outfolder = os.path.join(folder, str(compact_classes))
+            EcoreGenerator(compact_classes=compact_classes).generate(model, outfolder)
+            memory, seconds = measure(outfolder, args.count)
+            print('{:>8} {:>16.0f} {:>16.2f}'.format('compact' if compact_classes else 'default',
+                                                     memory, seconds * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark of the package init task on packages with many bidirectional references.
+
+Renders the init module of packages with an increasing number of eOpposite pairs. With linear
+scaling, the time per opposite stays roughly constant::
+
+    $ python benchmarks/opposites.py
+"""
+import argparse
+import time
+
+from pyecore import ecore
+from pyecoregen.ecore import EcoreGenerator, EcorePackageInitTask
+from pyecoregen.index import ModelIndex
+
+
+def create_package(pairs):
+    """Returns package with given number of class pairs, linked by a bidirectional reference."""
+    package = ecore.EPackage('opposites')
+    for i in range(pairs):
+        left = ecore.EClass('Left{}'.format(i))
+        right = ecore.EClass('Right{}'.format(i))
+        to_right = ecore.EReference('right', right, upper=-1)
+        to_left = ecore.EReference('left', left, eOpposite=to_right)
+        left.eStructuralFeatures.append(to_right)
+        right.eStructuralFeatures.append(to_left)
+        package.eClassifiers.extend([left, right])
+    return package
+
+
+def time_init_task(pairs, repeat):
+    """Returns best time of rendering the init module of a package with given number of pairs."""
+    package = create_package(pairs)
+    generator = EcoreGenerator(formatter='raw')
+    task = next(t for t in generator.tasks if isinstance(t, EcorePackageInitTask))
+    task.index = ModelIndex(package)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        task.render(package)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 1000, 2000, 4000, 8000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print('{:>10} {:>12} {:>16}'.format('opposites', 'time [s]', 'per opposite [us]'))
+    for pairs in args.sizes:
+        seconds = time_init_task(pairs, args.repeat)
+        # each pair consists of two references with an opposite:
+        print('{:>10} {:>12.4f} {:>16.2f}'.format(2 * pairs, seconds, seconds / (2 * pairs) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
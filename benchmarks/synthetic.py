@@ -0,0 +1,103 @@
+"""
+Synthetic metamodels of configurable size, used by the benchmarks.
+
+The created metamodels are deterministic: creating a metamodel twice with the same parameters
+results in identical models and hence identical generated code.
+"""
+import os
+
+from pyecore import ecore
+from pyecore.resources import ResourceSet, URI
+
+
+def create_package(index, classes, depth, opposites):
+    """
+    Returns package with given number of classes.
+
+    Args:
+        index: Number of package, used to build unique names.
+        classes: Number of classes in package.
+        depth: Length of the inheritance chains the classes are organized in. Each class inherits
+            from the previous class of its chain.
+        opposites: Number of bidirectional references between the classes of the package.
+    """
+    name = 'pkg{}'.format(index)
+    package = ecore.EPackage(name, nsURI='http://synthetic/{}'.format(name), nsPrefix=name)
+
+    eclasses = []
+    for i in range(classes):
+        eclass = ecore.EClass('{}Class{}'.format(name.capitalize(), i))
+        if i % depth:
+            eclass.eSuperTypes.append(eclasses[i - 1])
+        eclass.eStructuralFeatures.append(ecore.EAttribute('name{}'.format(i), ecore.EString))
+        eclass.eStructuralFeatures.append(ecore.EAttribute('values{}'.format(i), ecore.EInt,
+                                                           upper=-1))
+        eclasses.append(eclass)
+    package.eClassifiers.extend(eclasses)
+
+    package.eClassifiers.append(ecore.EEnum('{}Kind'.format(name.capitalize()),
+                                            literals=['LITERAL0', 'LITERAL1', 'LITERAL2']))
+
+    for i in range(min(opposites, classes * classes)):
+        left = eclasses[i % classes]
+        right = eclasses[(i * 7 + 1) % classes]
+        to_right = ecore.EReference('right{}'.format(i), right, upper=-1)
+        to_left = ecore.EReference('left{}'.format(i), left, eOpposite=to_right)
+        left.eStructuralFeatures.append(to_right)
+        right.eStructuralFeatures.append(to_left)
+
+    return package
+
+
+def create_metamodel(packages, classes, depth=1, opposites=0):
+    """
+    Returns list of root packages of a synthetic metamodel.
+
+    Each class of package `n` references a class of package `n - 1`, so the root packages depend
+    on each other like a chain.
+    """
+    roots = [create_package(i, classes, depth, opposites) for i in range(packages)]
+    for previous, package in zip(roots, roots[1:]):
+        targets = previous.eClassifiers[:classes]
+        for i, eclass in enumerate(package.eClassifiers[:classes]):
+            eclass.eStructuralFeatures.append(ecore.EReference('cross{}'.format(i), targets[i]))
+    return roots
+
+
+def create_package_tree(subpackages, classes, depth=1, opposites=0):
+    """
+    Returns root package with given number of subpackages.
+
+    The root package holds a single class referencing a class of the first subpackage, the other
+    subpackages are independent of each other.
+    """
+    root = ecore.EPackage('tree', nsURI='http://synthetic/tree', nsPrefix='tree')
+    root.eSubpackages.extend(create_package(i, classes, depth, opposites)
+                             for i in range(subpackages))
+
+    eclass = ecore.EClass('Root')
+    first = root.eSubpackages[0].eClassifiers[0]
+    eclass.eStructuralFeatures.append(ecore.EReference('first', first))
+    root.eClassifiers.append(eclass)
+    return root
+
+
+def save_metamodel(roots, folder):
+    """Saves each root package to its own `.ecore` file in folder and returns the file paths."""
+    rset = ResourceSet()
+    resources = []
+    for package in roots:
+        path = os.path.join(folder, '{}.ecore'.format(package.name))
+        resource = rset.create_resource(URI(path))
+        resource.append(package)
+        resources.append(resource)
+
+    # references between the packages are stored as hrefs into the other files:
+    for resource in resources:
+        resource.save()
+    return [r.uri.plain for r in resources]
+
+
+def load_metamodel(path):
+    """Loads metamodel from `.ecore` file, returns its root package."""
+    return ResourceSet().get_resource(URI(path)).contents[0]
@@ -0,0 +1,3 @@
+"""Python code generation from pyecore models."""
+
+__version__ = '0.5.1'
@@ -1,10 +1,7 @@
-"""In place model adaptation of properties to become Python code compatible."""
-import contextlib
+"""Adaptation of model element names to become Python code compatible."""
 import keyword
 import logging
 
-from pyecore import ecore
-
 _logger = logging.getLogger(__name__)
 
 
@@ -15,18 +12,8 @@ def fix_name_clash(value):
     return value
 
 
-@contextlib.contextmanager
-def pythonic_names():
-    original_get_attribute = ecore.ENamedElement.__getattribute__
-
-    def get_attribute(self, name):
-        value = original_get_attribute(self, name)
-
-        if name == 'name':
-            value = fix_name_clash(value)
-
-        return value
-
-    ecore.ENamedElement.__getattribute__ = get_attribute
-    yield
-    ecore.ENamedElement.__getattribute__ = original_get_attribute
+def pythonic_name(element):
+    """Returns name of named element, adapted to not clash with Python keywords."""
+    if element is None:
+        return None
+    return fix_name_clash(element.name)
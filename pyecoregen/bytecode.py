@@ -0,0 +1,73 @@
+"""Byte-compilation of generated modules in parallel worker processes."""
+import compileall
+import concurrent.futures
+import functools
+import logging
+import py_compile
+
+_logger = logging.getLogger(__name__)
+
+# Names of the invalidation modes of the bytecode files, as for `python -m compileall`:
+INVALIDATION_MODES = ('timestamp', 'checked-hash', 'unchecked-hash')
+
+
+def invalidation_modes_supported():
+    """Returns whether invalidation modes can be chosen, which requires Python 3.7."""
+    return hasattr(py_compile, 'PycInvalidationMode')
+
+
+def get_invalidation_mode(name):
+    """Returns `py_compile.PycInvalidationMode` of name, `None` for Python's default mode."""
+    if name is None:
+        return None
+    if name not in INVALIDATION_MODES:
+        raise ValueError('Unknown invalidation mode {!r}, expected one of {}.'.format(
+            name, ', '.join(INVALIDATION_MODES)))
+    if not invalidation_modes_supported():
+        raise ValueError('Invalidation mode {!r} requires Python 3.7.'.format(name))
+    return py_compile.PycInvalidationMode[name.upper().replace('-', '_')]
+
+
+def compile_file(path, optimize=-1, invalidation_mode=None):
+    """
+    Compiles Python file to its bytecode file in `__pycache__`, returns whether it succeeded.
+
+    With timestamp invalidation, bytecode files still matching their source are not compiled
+    again, so files left untouched by an incremental generation are skipped.
+    """
+    kwargs = {}
+    if invalidation_mode is not None:
+        # keyword added in Python 3.7:
+        kwargs['invalidation_mode'] = invalidation_mode
+    return bool(compileall.compile_file(path, quiet=1, optimize=optimize, **kwargs))
+
+
+def compile_all(paths, jobs=1, optimize=-1, invalidation_mode=None):
+    """
+    Compiles Python files to bytecode, returns the paths of the files that failed to compile.
+
+    Args:
+        paths: Paths of files to compile, files not ending in `.py` are ignored.
+        jobs: Number of worker processes to compile with.
+        optimize: Optimization level of the bytecode as for `compile`, `-1` for the level of the
+            running interpreter.
+        invalidation_mode: `py_compile.PycInvalidationMode` of the bytecode files, `None` for
+            Python's default, which is checked hashes if `SOURCE_DATE_EPOCH` is set.
+    """
+    paths = [p for p in paths if p.endswith('.py')]
+    compile_ = functools.partial(compile_file, optimize=optimize,
+                                 invalidation_mode=invalidation_mode)
+
+    if jobs < 2 or len(paths) < 2:
+        results = [compile_(p) for p in paths]
+    else:
+        jobs = min(jobs, len(paths))
+        _logger.debug('Compiling {} files in {} worker processes.'.format(len(paths), jobs))
+        with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+            chunksize = max(1, len(paths) // (jobs * 4))
+            results = list(executor.map(compile_, paths, chunksize=chunksize))
+
+    failed = [p for p, ok in zip(paths, results) if not ok]
+    for path in failed:
+        _logger.error('Cannot byte-compile {!r}.'.format(path))
+    return failed
@@ -0,0 +1,337 @@
+"""On-disk caches of compiled Jinja templates and parsed metamodels, shared by all runs."""
+import contextlib
+import functools
+import gc
+import hashlib
+import logging
+import marshal
+import os
+import urllib.request
+
+import jinja2
+import pyecore
+from pyecore import ecore
+from pyecore.resources import ResourceSet
+from pyecore.resources.resource import HttpURI
+from pyecore.resources.xmi import XMIResource
+
+_logger = logging.getLogger(__name__)
+
+# Environment variable overriding the default cache directory:
+CACHE_DIR_VARIABLE = 'PYECOREGEN_CACHE_DIR'
+
+
+def default_cache_dir():
+    """Returns folder holding the caches of pyecoregen, following the XDG base directory spec."""
+    directory = os.environ.get(CACHE_DIR_VARIABLE)
+    if directory:
+        return directory
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'pyecoregen')
+
+
+class TemplateCache(jinja2.FileSystemBytecodeCache):
+    """
+    Bytecode cache of the compiled templates.
+
+    Jinja identifies cached templates by their name and path and discards them if the checksum of
+    the template source changed. As the compiled code is specific to the Jinja version, the cache
+    keeps a separate folder per version. The cache is an optimization only, errors accessing it are
+    logged and otherwise ignored, so templates are compiled as without cache.
+    """
+
+    def __init__(self, directory=None):
+        directory = os.path.join(directory or default_cache_dir(),
+                                 'jinja-{}'.format(jinja2.__version__))
+        super().__init__(directory, pattern='%s.cache')
+
+    def load_bytecode(self, bucket):
+        try:
+            super().load_bytecode(bucket)
+        except (OSError, ValueError, EOFError) as e:
+            _logger.debug('Cannot read template cache in {!r}: {}'.format(self.directory, e))
+            bucket.reset()
+
+    def dump_bytecode(self, bucket):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            super().dump_bytecode(bucket)
+        except OSError as e:
+            _logger.debug('Cannot write template cache in {!r}: {}'.format(self.directory, e))
+
+
+class ModelCache:
+    """
+    Cache of parsed `.ecore` files, skipping the XMI parsing of files that did not change.
+
+    A parsed file is stored as a snapshot of its model elements, with references stored as indices
+    into the snapshot instead of XMI paths, so restoring does not need to resolve them. Snapshots
+    are stored with `marshal`, which only supports plain values and cannot execute code. A file
+    is identified by its URI, a snapshot is valid as long as the modification time and size of a
+    local file, or the `ETag` or `Last-Modified` header of a remote file, do not change. Files
+    that cannot be snapshotted, e.g. because they hold elements of other metamodels than Ecore,
+    are always parsed.
+    """
+
+    # version of the snapshot format, to be increased on incompatible changes:
+    version = 1
+
+    def __init__(self, directory=None):
+        folder = 'models-{}-pyecore-{}'.format(self.version, pyecore.__version__)
+        self.directory = os.path.join(directory or default_cache_dir(), folder)
+
+    def resource_set(self):
+        """Returns new resource set loading `.ecore` files through this cache."""
+        rset = ResourceSet()
+        rset.resource_factory['ecore'] = functools.partial(CachedXMIResource, cache=self)
+        return rset
+
+    def path(self, uri):
+        """Returns path of cache file of resource URI."""
+        key = hashlib.sha256(uri.normalize().encode()).hexdigest()
+        return os.path.join(self.directory, key + '.cache')
+
+    @staticmethod
+    def stamp(uri):
+        """Returns value identifying the current version of file at URI, `None` if unknown."""
+        try:
+            if isinstance(uri, HttpURI):
+                request = urllib.request.Request(uri.plain, method='HEAD')
+                with urllib.request.urlopen(request) as response:
+                    return response.headers.get('ETag') or response.headers.get('Last-Modified')
+            stat = os.stat(uri.plain)
+            return stat.st_mtime_ns, stat.st_size
+        except (OSError, ValueError) as e:
+            _logger.debug('Cannot stamp {!r}: {}'.format(uri.plain, e))
+            return None
+
+    def load(self, uri, stamp):
+        """Returns snapshot of file at URI stored with given stamp, `None` if not cached."""
+        try:
+            with open(self.path(uri), 'rb') as file:
+                cached_stamp, snapshot = marshal.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError, TypeError) as e:
+            _logger.debug('Cannot read model cache in {!r}: {}'.format(self.directory, e))
+            return None
+        return snapshot if cached_stamp == stamp else None
+
+    def dump(self, uri, stamp, snapshot):
+        """Stores snapshot of file at URI with given stamp."""
+        path = self.path(uri)
+        temppath = '{}.{}.tmp'.format(path, os.getpid())
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temppath, 'wb') as file:
+                marshal.dump((stamp, snapshot), file)
+            os.replace(temppath, path)
+        except (OSError, ValueError) as e:
+            _logger.debug('Cannot write model cache in {!r}: {}'.format(self.directory, e))
+            with contextlib.suppress(OSError):
+                os.remove(temppath)
+
+
+class CachedXMIResource(XMIResource):
+    """XMI resource restored from a `ModelCache` if possible, stored in it after parsing."""
+
+    def __init__(self, uri=None, use_uuid=False, *, cache):
+        super().__init__(uri, use_uuid)
+        self.cache = cache
+
+    def load(self, options=None):
+        stamp = self.cache.stamp(self.uri)
+        snapshot = self.cache.load(self.uri, stamp) if stamp is not None else None
+        if snapshot is not None:
+            _logger.debug('Restoring {!r} from model cache.'.format(self.uri.plain))
+            self.options = options or {}
+            # the restored elements are all alive, collecting garbage meanwhile is wasted time:
+            enabled = gc.isenabled()
+            gc.disable()
+            try:
+                _restore(self, snapshot)
+            finally:
+                if enabled:
+                    gc.enable()
+            return
+
+        super().load(options)
+        if stamp is not None:
+            snapshot = _snapshot(self)
+            if snapshot is not None:
+                self.cache.dump(self.uri, stamp, snapshot)
+
+
+class _Uncacheable(Exception):
+    pass
+
+
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+
+
+@functools.lru_cache(maxsize=None)
+def _constructor_values(eclass):
+    """Returns attribute values set by the constructor of Ecore class, by name."""
+    element = eclass('name') if eclass is ecore.EClass else eclass()
+    return {f.name: element.eGet(f) for f in element.eClass.eAllAttributes()
+            if not f.many and element.eIsSet(f)}
+
+
+def _snapshot(resource):
+    """
+    Returns snapshot of resource's model elements as plain values, `None` if not possible.
+
+    The snapshot is a tuple of the XML namespace prefixes, the list of elements, the list of
+    references and the XMI ids. Each element is stored as tuple of the name of its Ecore class, the
+    index of its container element or `-1` for roots, the name of its containment feature, its
+    attribute values and the details of annotations. Each reference is stored as tuple of the index
+    of its owner, its name and its targets, which are element indices or, for proxies, their XMI
+    paths. XMI ids are stored as pairs of id and element index.
+    """
+    indices = {}
+    elements = []
+    pending = []
+
+    def add(element, container, feature):
+        eclass = element.eClass
+        if type(element) is not getattr(ecore, eclass.name, None):
+            raise _Uncacheable(eclass.name)
+
+        constructor_values = _constructor_values(type(element))
+        attributes = []
+        children = []
+        for f in eclass.eAllStructuralFeatures():
+            if f.derived or f.transient:
+                continue
+            if isinstance(element, ecore.EAnnotation) and f.name == 'details':
+                continue
+            if isinstance(f, ecore.EAttribute):
+                if not element.eIsSet(f):
+                    continue
+                value = element.eGet(f)
+                if f.name in constructor_values and constructor_values[f.name] == value:
+                    continue
+                values = list(value) if f.many else [value]
+                if not all(isinstance(v, _PLAIN_TYPES) for v in values):
+                    raise _Uncacheable(f.name)
+                attributes.append((f.name, values if f.many else value))
+            elif f.containment:
+                if element.eIsSet(f):
+                    children.append(f)
+            elif not (f.eOpposite and f.eOpposite.containment):
+                # references set by property, like eOpposite, do not count as set, their values
+                # are checked instead:
+                value = element.eGet(f)
+                if value if f.many else value is not None:
+                    pending.append((element, f))
+
+        details = None
+        if isinstance(element, ecore.EAnnotation):
+            details = list(element.details.items())
+            if not all(isinstance(v, _PLAIN_TYPES) for item in details for v in item):
+                raise _Uncacheable('details')
+
+        indices[element] = len(elements)
+        elements.append((eclass.name, indices.get(container, -1), feature, attributes, details))
+
+        for f in children:
+            value = element.eGet(f)
+            for child in (value if f.many else [value]):
+                add(child, element, f.name)
+
+    def target(value):
+        if type(value) is ecore.EProxy:
+            if object.__getattribute__(value, '_proxy_resource') is not resource:
+                raise _Uncacheable('proxy')
+            return object.__getattribute__(value, '_proxy_path')
+        try:
+            return indices[value]
+        except (KeyError, TypeError):
+            raise _Uncacheable(repr(value)) from None
+
+    try:
+        for root in resource.contents:
+            add(root, None, None)
+        references = []
+        for element, f in pending:
+            value = element.eGet(f)
+            targets = [target(v) for v in (value if f.many else [value])]
+            references.append((indices[element], f.name, targets))
+        uuids = [(key, target(element)) for key, element in resource.uuid_dict.items()]
+    except _Uncacheable as e:
+        _logger.debug('Cannot cache {!r}: {} not supported.'.format(resource.uri.plain, e))
+        return None
+
+    return dict(resource.prefixes), elements, references, uuids
+
+
+def _restore(resource, snapshot):
+    """Restores model elements of resource from snapshot, as parsing would create them."""
+    prefixes, elements, references, uuids = snapshot
+    resource.prefixes.update(prefixes)
+    resource.reverse_nsmap = {v: k for k, v in resource.prefixes.items()}
+
+    @functools.lru_cache(maxsize=None)
+    def many(eclass, name):
+        return eclass.findEStructuralFeature(name).many
+
+    objects = []
+    for class_name, container, feature, attributes, details in elements:
+        eclass = getattr(ecore, class_name)
+        if container < 0:
+            element = eclass()
+            element._eresource = resource
+            resource.contents.append(element)
+        elif eclass is ecore.EClass:
+            # like the XMI parser, classes are created with their name:
+            element = eclass(dict(attributes).get('name'))
+        else:
+            element = eclass()
+
+        for name, value in attributes:
+            if name == 'name' and eclass is ecore.EClass and container >= 0:
+                continue
+            if isinstance(value, list):
+                element.__getattribute__(name).extend(value)
+            else:
+                element.__setattr__(name, value)
+
+        if container >= 0:
+            parent = objects[container]
+            if many(parent.eClass, feature):
+                parent.__getattribute__(feature).append(element)
+            else:
+                parent.__setattr__(feature, element)
+
+        if details is not None:
+            for key, value in details:
+                element.details[key] = value
+                if key == 'documentation':
+                    documented = element.eContainer()
+                    if hasattr(documented, 'python_class'):
+                        documented = documented.python_class
+                    documented.__doc__ = value
+        objects.append(element)
+
+    proxies = {}
+
+    def resolve(target):
+        if isinstance(target, int):
+            return objects[target]
+        if target not in proxies:
+            proxies[target] = ecore.EProxy(path=target, resource=resource)
+        return proxies[target]
+
+    resource.use_uuid = bool(uuids)
+    for key, index in uuids:
+        objects[index]._internal_id = key
+        resource.uuid_dict[key] = objects[index]
+
+    # like the XMI parser, opposites are set after all other references:
+    references.sort(key=lambda r: r[1] == 'eOpposite')
+    for index, name, targets in references:
+        element = objects[index]
+        if many(element.eClass, name):
+            element.__getattribute__(name).extend(resolve(t) for t in targets)
+        else:
+            element.__setattr__(name, resolve(targets[0]))
@@ -1,12 +1,18 @@
 """Command line interface for generation of static Python classes from Ecore model."""
 import argparse
 import collections
+import cProfile
 import logging
+import os
 import sys
 import re
 
 import pyecore.resources
+from pyecoregen.bytecode import INVALIDATION_MODES, invalidation_modes_supported
+from pyecoregen.cache import ModelCache
 from pyecoregen.ecore import EcoreGenerator
+from pyecoregen.formatter import FORMATTERS
+from pyecoregen.watch import Watcher
 
 URL_PATTERN = re.compile('^http(s)?://.*')
 
@@ -21,8 +27,14 @@ def generate_from_cli(args):
     parser.add_argument(
         '--ecore-model',
         '-e',
-        help="Path to Ecore XMI file.",
-        required=True
+        help="Path to Ecore XMI file, can be given several times.",
+        action='append',
+        default=[]
+    )
+    parser.add_argument(
+        '--model-list',
+        help="Path to text file listing Ecore XMI files to generate, one per line. Relative paths "
+             "are relative to the folder of the file, lines starting with '#' are ignored.",
     )
     parser.add_argument(
         '--out-folder',
@@ -44,6 +56,109 @@ def generate_from_cli(args):
         help="Generates code for every metamodel the input metamodel depends on.",
         action='store_true'
     )
+    parser.add_argument(
+        '--lazy-imports',
+        help="Generate packages loading their subpackages and referenced packages on demand.",
+        action='store_true'
+    )
+    parser.add_argument(
+        '--compact-classes',
+        help="Generate classes storing single-valued attributes without value containers, "
+             "using less memory per instance at the cost of slower attribute updates.",
+        action='store_true'
+    )
+    parser.add_argument(
+        '--flat-init',
+        help="Generate constructors setting the features of all base classes directly, instead of "
+             "calling the constructor of each base class.",
+        action='store_true'
+    )
+    parser.add_argument(
+        '--bulk-factories',
+        help="Generate a 'create_many' class method per class, creating instances from rows or "
+             "columns of feature values.",
+        action='store_true'
+    )
+    parser.add_argument(
+        '--incremental',
+        help="Skip generation of packages that did not change since the last run.",
+        action='store_true'
+    )
+    parser.add_argument(
+        '--jobs',
+        '-j',
+        help="Number of worker processes generating code in parallel, 0 for one per CPU.",
+        type=int,
+        default=1
+    )
+    parser.add_argument(
+        '--formatter',
+        help="Formatter applied to the generated code: 'autopep8' (default) formats each file, "
+             "'parallel' formats each file with autopep8 in --jobs worker processes, 'fast' only "
+             "normalizes whitespace, so its output is not fully PEP 8 clean, e.g. long lines are "
+             "kept, and 'raw' leaves the template output as is.",
+        choices=sorted(FORMATTERS),
+        default='autopep8'
+    )
+    parser.add_argument(
+        '--stream',
+        help="Write each file while rendering it, so memory does not grow with the size of the "
+             "generated files. Requires the 'fast' or 'raw' formatter.",
+        action='store_true'
+    )
+    parser.add_argument(
+        '--byte-compile',
+        help="Compile the generated modules to bytecode files, in --jobs worker processes, so "
+             "their first import does not compile them.",
+        action='store_true'
+    )
+    parser.add_argument(
+        '--compile-optimize',
+        help="Optimization level of the bytecode files written with --byte-compile, -1 for the "
+             "level of the running interpreter.",
+        type=int,
+        choices=[-1, 0, 1, 2],
+        default=-1
+    )
+    parser.add_argument(
+        '--invalidation-mode',
+        help="Invalidation mode of the bytecode files written with --byte-compile, hash-based "
+             "modes do not depend on modification times, for reproducible builds. By default "
+             "Python's default mode is used.",
+        choices=INVALIDATION_MODES
+    )
+    parser.add_argument(
+        '--no-template-cache',
+        help="Compile the templates without reading or writing the on-disk template cache.",
+        action='store_true'
+    )
+    parser.add_argument(
+        '--model-cache',
+        help="Restore unchanged Ecore files from an on-disk cache of parsed metamodels instead "
+             "of parsing them, and cache newly parsed files.",
+        action='store_true'
+    )
+    parser.add_argument(
+        '--watch',
+        help="Keep running and regenerate the code of changed packages whenever the Ecore file "
+             "or, with --with-dependencies, one of its dependencies changes.",
+        action='store_true'
+    )
+    parser.add_argument(
+        '--watch-interval',
+        help="Seconds between two checks for changed files in watch mode.",
+        type=float,
+        default=1.0
+    )
+    parser.add_argument(
+        '--profile',
+        help="Path to JSON file the durations of each generation phase, task and package are "
+             "written to.",
+    )
+    parser.add_argument(
+        '--cprofile',
+        help="Path to file the cProfile statistics of the generation are dumped to.",
+    )
     parser.add_argument(
         '--verbose',
         '-v',
@@ -52,14 +167,62 @@ def generate_from_cli(args):
     )
 
     parsed_args = parser.parse_args(args)
+    paths = list(parsed_args.ecore_model)
+    if parsed_args.model_list:
+        paths.extend(read_model_list(parsed_args.model_list))
+    if not paths:
+        parser.error('one of the arguments --ecore-model/-e --model-list is required')
+    if parsed_args.watch and any(URL_PATTERN.match(p) for p in paths):
+        parser.error('--watch requires local Ecore files')
+    if parsed_args.invalidation_mode and not invalidation_modes_supported():
+        parser.error('--invalidation-mode requires Python 3.7 or later')
 
     configure_logging(parsed_args)
-    model = load_model(parsed_args.ecore_model)
-    EcoreGenerator(
+    generator = EcoreGenerator(
         auto_register_package=parsed_args.auto_register_package,
         user_module=parsed_args.user_module,
-        with_dependencies=parsed_args.with_dependencies
-    ).generate(model, parsed_args.out_folder)
+        with_dependencies=parsed_args.with_dependencies,
+        lazy_imports=parsed_args.lazy_imports,
+        compact_classes=parsed_args.compact_classes,
+        flat_init=parsed_args.flat_init,
+        bulk_factories=parsed_args.bulk_factories,
+        incremental=parsed_args.incremental,
+        jobs=parsed_args.jobs,
+        formatter=parsed_args.formatter,
+        streaming=parsed_args.stream,
+        byte_compile=parsed_args.byte_compile,
+        compile_optimize=parsed_args.compile_optimize,
+        invalidation_mode=parsed_args.invalidation_mode,
+        template_cache=not parsed_args.no_template_cache
+    )
+
+    # all models share a resource set, so common dependencies are only loaded once:
+    if parsed_args.model_cache:
+        rset = ModelCache().resource_set()
+    else:
+        rset = pyecore.resources.ResourceSet()
+
+    profiler = cProfile.Profile() if parsed_args.cprofile else None
+    if profiler:
+        profiler.enable()
+
+    if parsed_args.watch:
+        watcher = Watcher(generator, paths, parsed_args.out_folder,
+                          interval=parsed_args.watch_interval, resource_set=rset)
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            pass
+    else:
+        with generator.profile.measure('load'):
+            models = [load_model(p, rset) for p in paths]
+        generator.generate_many(models, parsed_args.out_folder)
+
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(parsed_args.cprofile)
+    if parsed_args.profile:
+        generator.profile.save(parsed_args.profile)
 
 
 def configure_logging(parsed_args):
@@ -81,9 +244,19 @@ def select_uri_implementation(ecore_model_path):
     return pyecore.resources.URI
 
 
-def load_model(ecore_model_path):
+def read_model_list(path):
+    """Returns paths of the Ecore files listed in text file, relative to the current folder."""
+    folder = os.path.dirname(path)
+    with open(path) as file:
+        lines = [line.strip() for line in file]
+    return [line if URL_PATTERN.match(line) else os.path.join(folder, line)
+            for line in lines if line and not line.startswith('#')]
+
+
+def load_model(ecore_model_path, rset=None):
     """Load a single Ecore model and return the root package."""
-    rset = pyecore.resources.ResourceSet()
+    if rset is None:
+        rset = pyecore.resources.ResourceSet()
     uri_implementation = select_uri_implementation(ecore_model_path)
     resource = rset.get_resource(uri_implementation(ecore_model_path))
     return resource.contents[0]
@@ -0,0 +1,101 @@
+"""Dependency graph of the resources a metamodel is spread over."""
+import collections
+import logging
+
+from pyecore import ecore
+
+_logger = logging.getLogger(__name__)
+
+
+def resource_name(resource):
+    """Returns printable name of resource."""
+    uri = getattr(resource, 'uri', None)
+    return getattr(uri, 'plain', None) or repr(resource)
+
+
+class ResourceGraph:
+    """
+    Graph of resources, connected by the cross-resource references the generated code depends on.
+
+    A resource depends on another one, if one of its classes has a supertype or a structural
+    feature typed by a classifier contained in the other resource. Only resources reachable from
+    the root resources are part of the graph, resources that are loaded into the same resource set
+    but are not referenced are ignored.
+
+    Attributes:
+        roots: Resources the graph was built from.
+        dependencies: Mapping of each resource to the list of resources it directly depends on, in
+            the order they are referenced in the model.
+    """
+
+    def __init__(self, *roots):
+        self.roots = roots
+        self.dependencies = {}
+
+        pending = collections.deque(roots)
+        while pending:
+            resource = pending.popleft()
+            if resource in self.dependencies:
+                continue
+            dependencies = self.direct_dependencies(resource)
+            self.dependencies[resource] = dependencies
+            pending.extend(dependencies)
+
+    @staticmethod
+    def referenced_types(resource):
+        """Yields all classifiers referenced from classes in resource."""
+        for root in resource.contents:
+            for element in root.eAllContents():
+                if isinstance(element, ecore.EClass):
+                    yield from element.eSuperTypes
+                    yield from (f.eType for f in element.eStructuralFeatures)
+
+    @classmethod
+    def direct_dependencies(cls, resource):
+        """Returns list of resources the given one directly depends on."""
+        dependencies = []
+        for classifier in cls.referenced_types(resource):
+            # builtin Ecore types are not contained in any resource:
+            dependency = getattr(classifier, 'eResource', None)
+            if dependency is not None and dependency is not resource \
+                    and dependency not in dependencies:
+                dependencies.append(dependency)
+        return dependencies
+
+    def topological_order(self):
+        """
+        Returns list of all resources, each of them after the resources it depends on.
+
+        Resources depending on each other cyclically are returned in the order they are found.
+        """
+        order = []
+        visited = set()
+
+        for root in self.roots:
+            if root in visited:
+                continue
+            visited.add(root)
+
+            # iterative depth-first search, as dependency chains may be arbitrarily long:
+            stack = [(root, iter(self.dependencies[root]))]
+            while stack:
+                resource, dependencies = stack[-1]
+                for dependency in dependencies:
+                    if dependency not in visited:
+                        visited.add(dependency)
+                        stack.append((dependency, iter(self.dependencies[dependency])))
+                        break
+                else:
+                    stack.pop()
+                    order.append(resource)
+
+        return order
+
+    def report(self):
+        """Logs each resource of the graph with its dependencies, in topological order."""
+        for resource in self.topological_order():
+            dependencies = self.dependencies[resource]
+            _logger.info('Resource {!r} depends on {}.'.format(
+                resource_name(resource),
+                ', '.join(repr(resource_name(r)) for r in dependencies) or 'no other resource'
+            ))
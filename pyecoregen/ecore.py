@@ -1,13 +1,38 @@
 """Support for generation for models based on pyecore."""
+import collections
+import contextlib
+import hashlib
 import itertools
+import logging
 import os
 import re
 
+import jinja2
 import multigen.formatter
 import multigen.jinja
 from pyecore import ecore
 from pyecore.resources import Resource
-from pyecoregen.adapter import pythonic_names, fix_name_clash
+import pyecoregen
+from pyecoregen.adapter import pythonic_name, fix_name_clash
+from pyecoregen.bytecode import compile_all, get_invalidation_mode
+from pyecoregen.cache import TemplateCache
+from pyecoregen.dependencies import ResourceGraph
+from pyecoregen.formatter import get_formatter, get_line_formatter
+from pyecoregen.index import ModelIndex
+from pyecoregen.manifest import Manifest, package_digests, qualified_name
+from pyecoregen.parallel import render_all
+from pyecoregen.profiling import Profile
+from pyecoregen.writer import MemoryWriter, Writer, split_lines
+
+_logger = logging.getLogger(__name__)
+
+# Jinja < 3.0 only knows the deprecated name:
+pass_context = getattr(jinja2, 'pass_context', None) or jinja2.contextfilter
+
+
+@contextlib.contextmanager
+def _unmeasured():
+    yield
 
 
 class EcoreTask(multigen.jinja.JinjaTask):
@@ -16,23 +41,40 @@ class EcoreTask(multigen.jinja.JinjaTask):
 
     Attributes:
         element_type: Ecore type to be searched in model and to be iterated over.
+        index: Index of the model currently generated, to be set by generator.
+        profile: Profile recording the duration of each phase of generating a file, to be set by
+            generator. Nothing is recorded if not set.
+        streaming: Flag, whether files are written chunk by chunk while rendering, instead of
+            rendering and formatting their whole code first.
+        line_formatter: Function formatting streamed code line by line, see
+            `pyecoregen.formatter.get_line_formatter`. Chunks are written as rendered if not set.
+        writer: Writer of the generated files, counting written and unchanged files, to be set by
+            generator. Files are written by a new writer if not set.
+        contexts: Template contexts computed in the current generation, shared by all tasks, to be
+            set by generator. Contexts are computed for each file if not set.
     """
 
     element_type = None
+    index = None
+    profile = None
+    streaming = False
+    line_formatter = None
+    writer = None
+    contexts = None
 
     def filtered_elements(self, model):
         """Return iterator based on `element_type`."""
         if isinstance(model, self.element_type):
             yield model
-        yield from (e for e in model.eAllContents() if isinstance(e, self.element_type))
+        yield from self.all_contents(model, self.element_type)
 
     @classmethod
     def folder_path_for_package(cls, package: ecore.EPackage):
         """Returns path to folder holding generated artifact for given element."""
         parent = package.eContainer()
         if parent:
-            return os.path.join(cls.folder_path_for_package(parent), package.name)
-        return package.name
+            return os.path.join(cls.folder_path_for_package(parent), pythonic_name(package))
+        return pythonic_name(package)
 
     @staticmethod
     def filename_for_element(package: ecore.EPackage):
@@ -40,10 +82,107 @@ class EcoreTask(multigen.jinja.JinjaTask):
         raise NotImplementedError
 
     def relative_path_for_element(self, element: ecore.EPackage):
-        path = os.path.join(self.folder_path_for_package(element),
+        folder_path = self.index.folder_path(element) if self.index else None
+        path = os.path.join(folder_path or self.folder_path_for_package(element),
                             self.filename_for_element(element))
         return path
 
+    def all_contents(self, element, type_):
+        """Returns all contents of element with given type, read from model index if possible."""
+        contents = self.index.contents(element, type_) if self.index else None
+        if contents is None:
+            contents = [e for e in element.eAllContents() if isinstance(e, type_)]
+        return contents
+
+    def create_template_context(self, element, **kwargs):
+        return super().create_template_context(element=element, index=self.index, **kwargs)
+
+    def template_context(self, element):
+        """
+        Returns template context for element, computed once per generation if possible.
+
+        Contexts are shared by all tasks creating them with the same method, e.g. the module and
+        mixin tasks, so the context of a package is computed once for both files.
+        """
+        if self.contexts is None:
+            return self.create_template_context(element=element)
+        key = type(self).create_template_context, element
+        context = self.contexts.get(key)
+        if context is None:
+            context = self.contexts[key] = self.create_template_context(element=element)
+        return context
+
+    @staticmethod
+    def group_by_package(classifiers):
+        """
+        Returns lists of given classifiers by their package.
+
+        Packages are ordered by qualified name and classifiers by name, so code generated from the
+        groups does not depend on the iteration order of sets, which changes with the hash seed.
+        """
+        def key(classifier):
+            package = classifier.ePackage
+            return qualified_name(package), getattr(package, 'nsURI', None) or '', classifier.name
+
+        grouped = {}
+        for classifier in sorted(classifiers, key=key):
+            grouped.setdefault(classifier.ePackage, []).append(classifier)
+        return grouped
+
+    def measure(self, phase, element):
+        """Returns context manager recording the duration of phase for element, if profiling."""
+        if self.profile is None:
+            return _unmeasured()
+        return self.profile.measure(phase, type(self).__name__, qualified_name(element))
+
+    def render(self, element):
+        """Returns the formatted code generated for given element."""
+        with self.measure('context', element):
+            template = self.environment.get_template(self.template_name)
+            context = self.template_context(element)
+        with self.measure('render', element):
+            raw = template.render(**context)
+        with self.measure('format', element):
+            return self.formatter(raw)
+
+    def run(self, element, outfolder, code=None):
+        """
+        Apply this task to model element.
+
+        Args:
+            code: Code already rendered for element, e.g. by a worker process. If not given, the
+                code is rendered as part of this call.
+        """
+        filepath = self.relative_path_for_element(element)
+        if outfolder and not os.path.isabs(filepath):
+            filepath = os.path.join(outfolder, filepath)
+
+        _logger.debug('{!r} --> {!r}'.format(element, filepath))
+
+        # the writer creates the folder, unless keeping the file in memory:
+        self.generate_file(element, filepath, code)
+
+    def stream(self, element, filepath):
+        """Renders code for element and writes it to file chunk by chunk, if changed."""
+        with self.measure('context', element):
+            template = self.environment.get_template(self.template_name)
+            context = self.template_context(element)
+        with self.measure('stream', element):
+            chunks = template.generate(**context)
+            if self.line_formatter:
+                chunks = (line + '\n' for line in self.line_formatter(split_lines(chunks)))
+            (self.writer or Writer()).stream(filepath, chunks)
+
+    def generate_file(self, element, filepath, code=None):
+        if code is None and self.streaming:
+            self.stream(element, filepath)
+            return
+        if code is None:
+            code = self.render(element)
+
+        with self.measure('write', element):
+            (self.writer or Writer()).write(filepath, code)
+
 
 class EcorePackageInitTask(EcoreTask):
     """Generation of package init file from Ecore model with Jinja2."""
@@ -66,16 +205,38 @@ class EcorePackageInitTask(EcoreTask):
         references_types = (r.eType for r in references)
         imported = {c for c in references_types if getattr(c, 'ePackage', p) is not p}
 
-        imported_dict = {}
-        for classifier in imported:
-            imported_dict.setdefault(classifier.ePackage, set()).add(classifier)
+        return EcoreTask.group_by_package(imported)
 
-        return imported_dict
+    @staticmethod
+    def opposites(references):
+        """
+        Returns bidirectional references in given order, each with a flag telling whether its
+        opposite comes first.
+
+        The flag tells the template which side of a pair to wire the opposites on. Positions are
+        looked up in a map, so this takes linear time in the number of references.
+        """
+        opposites = [r for r in references if r.eOpposite]
+        positions = {r: i for i, r in enumerate(opposites)}
+        return [(r, positions.get(r.eOpposite, i) < i) for i, r in enumerate(opposites)]
 
     def create_template_context(self, element, **kwargs):
+        # with lazy imports, the references are wired by the modules:
+        if (self.global_context or {}).get('lazy_imports'):
+            return super().create_template_context(
+                element=element,
+                imported_classifiers_package={},
+                opposites=[]
+            )
+
+        opposites = []
+        if element.eSuperPackage is None:
+            opposites = self.opposites(self.all_contents(element, ecore.EReference))
+
         return super().create_template_context(
             element=element,
-            imported_classifiers_package=self.imported_classifiers_package(element)
+            imported_classifiers_package=self.imported_classifiers_package(element),
+            opposites=opposites
         )
 
 
@@ -97,27 +258,90 @@ class EcorePackageModuleTask(EcoreTask):
         attributes_types = (a.eType for a in attributes)
         imported |= {t for t in attributes_types if t.ePackage not in {p, ecore.eClass, None}}
 
-        imported_dict = {}
-        for classifier in imported:
-            imported_dict.setdefault(classifier.ePackage, set()).add(classifier)
+        return EcoreTask.group_by_package(imported)
 
-        return imported_dict
+    @staticmethod
+    def references(classes):
+        """
+        Returns references of given classes, each with a flag telling whether to wire its opposite.
+
+        Used with lazy imports, where each module wires its own references. Opposites within the
+        module are wired on the second reference of the pair, opposites in other modules are wired
+        by both modules, as either of them may be imported first.
+        """
+        references = [r for c in classes for r in c.eReferences]
+        positions = {r: i for i, r in enumerate(references)}
+        return [(r, bool(r.eOpposite) and positions.get(r.eOpposite, -1) < i)
+                for i, r in enumerate(references)]
+
+    @staticmethod
+    def referenced_classifiers(p: ecore.EPackage, references):
+        """Determines which classifiers have to be imported into given module to wire references."""
+        referenced = {r.eType for r, _ in references}
+        referenced |= {r.eOpposite.eContainingClass for r, wire_opposite in references
+                       if wire_opposite}
+        imported = {c for c in referenced if c.ePackage not in {p, ecore.eClass, None}}
+
+        return EcoreTask.group_by_package(imported)
 
     @staticmethod
     def classes(p: ecore.EPackage):
-        """Returns classes in package in ordered by number of bases."""
-        classes = (c for c in p.eClassifiers if isinstance(c, ecore.EClass))
-        return sorted(classes, key=lambda c: len(set(c.eAllSuperTypes())))
+        """
+        Returns classes in package, each following its base classes in the package.
+
+        The classes are sorted topologically over their direct supertypes with Kahn's algorithm,
+        which takes linear time in the number of classes and supertypes. The result generally
+        differs from the package order: classes without bases in the package come first, in
+        package order, and each other class is placed once its last base in the package is placed.
+
+        Raises:
+            ValueError: If the supertypes of classes in the package form a cycle, which Python
+                classes cannot express.
+        """
+        classes = [c for c in p.eClassifiers if isinstance(c, ecore.EClass)]
+        subclasses = {c: [] for c in classes}
+        pending = dict.fromkeys(classes, 0)
+        for c in classes:
+            # bases in other packages are imported and do not constrain the order:
+            for supertype in c.eSuperTypes:
+                if supertype in subclasses:
+                    subclasses[supertype].append(c)
+                    pending[c] += 1
+
+        ready = collections.deque(c for c in classes if not pending[c])
+        ordered = []
+        while ready:
+            eclass = ready.popleft()
+            ordered.append(eclass)
+            for subclass in subclasses[eclass]:
+                pending[subclass] -= 1
+                if not pending[subclass]:
+                    ready.append(subclass)
+
+        if len(ordered) < len(classes):
+            cyclic = [c.name for c in classes if pending[c]]
+            raise ValueError('Classes {} of package {!r} are part of or derive from an inheritance '
+                             'cycle.'.format(', '.join(cyclic), p.name))
+        return ordered
 
     @staticmethod
     def filename_for_element(package: ecore.EPackage):
-        return '{}.py'.format(package.name)
+        return '{}.py'.format(pythonic_name(package))
 
     def create_template_context(self, element, **kwargs):
+        classes = self.classes(element)
+        references = []
+        referenced_classifiers = {}
+        if (self.global_context or {}).get('lazy_imports'):
+            references = self.references(classes)
+            referenced_classifiers = self.referenced_classifiers(element, references)
+
         return super().create_template_context(
             element=element,
-            classes=self.classes(element),
-            imported_classifiers=self.imported_classifiers(element)
+            classes=classes,
+            imported_classifiers=self.imported_classifiers(element),
+            references=references,
+            referenced_classifiers=referenced_classifiers
         )
 
 
@@ -127,7 +351,7 @@ class EcorePackageMixinTask(EcorePackageModuleTask):
 
     @staticmethod
     def filename_for_element(package: ecore.EPackage):
-        return '{}_mixins.py.skeleton'.format(package.name)
+        return '{}_mixins.py.skeleton'.format(pythonic_name(package))
 
 
 class EcoreGenerator(multigen.jinja.JinjaGenerator):
@@ -143,6 +367,63 @@ class EcoreGenerator(multigen.jinja.JinjaGenerator):
 
         with_dependencies (bool): Flag, whether the code for direct and transitive dependencies of
             the metamodel sets as input should be generated.
+
+        incremental (bool): Flag, whether a manifest of package content hashes is kept in the
+            output folder to skip the generation of packages that did not change since the last
+            run.
+
+        jobs (int): Number of worker processes rendering and formatting the generated files in
+            parallel. `0` uses one process per CPU. The output is the same as with a single process.
+
+        formatter: Formatter applied to the generated code, either a callable or one of the names
+            of `pyecoregen.formatter.FORMATTERS`. A callable with a true `batch` attribute is called
+            once with the code of all generated files.
+
+        template_cache: Flag, whether compiled templates are cached on disk, or path of the cache
+            folder. If true, the cache is kept in the user's cache folder, see
+            `pyecoregen.cache.default_cache_dir`. Disabled by default, the command line enables
+            it.
+
+        lazy_imports (bool): Flag, whether generated packages load their subpackages on first
+            access and each module wires its own references, instead of the root package loading
+            and wiring the whole metamodel on import. Requires Python 3.7 in the generated code.
+
+        compact_classes (bool): Flag, whether generated classes store the values of single-valued,
+            non-derived attributes directly in the instance instead of in a pyecore value
+            container, to reduce the memory used per instance. Every attribute assignment then
+            runs a Python-level `__setattr__`, which makes updates slower.
+
+        flat_init (bool): Flag, whether each generated class gets a single constructor setting the
+            features of all its base classes, instead of chaining the constructors of the base
+            classes. Cannot be combined with `user_module`.
+
+        streaming (bool): Flag, whether the code of each file is written to the file while
+            rendering, formatted line by line, so the memory used does not depend on the size of
+            the generated files. Requires the 'fast' or 'raw' formatter. Files are rendered one
+            after the other, regardless of `jobs`.
+
+        bulk_factories (bool): Flag, whether each generated class gets a `create_many` class method
+            creating instances from rows or columns of feature values, optionally without
+            notifications.
+
+        byte_compile (bool): Flag, whether the generated modules are compiled to bytecode files
+            in `__pycache__` after each generation, in `jobs` worker processes, so their first
+            import does not compile them. Not applied when generating to memory.
+
+        compile_optimize (int): Optimization level of the bytecode files, `-1` for the level of
+            the running interpreter.
+
+        invalidation_mode (str): Invalidation mode of the bytecode files, one of
+            `pyecoregen.bytecode.INVALIDATION_MODES`. Hash-based bytecode files do not depend on
+            the modification time of the generated files, for reproducible builds. By default
+            Python's default mode is used.
+
+        writer (pyecoregen.writer.Writer): Writer of the last generation, holding the paths of the
+            written files and of the files left untouched as their content did not change.
+
+        profile (pyecoregen.profiling.Profile): Durations of the phases of all generations run by
+            this generator, per task and package, until cleared. A summary of the phases of each
+            generation is logged after it.
     """
 
     templates_path = os.path.join(
@@ -154,17 +435,51 @@ class EcoreGenerator(multigen.jinja.JinjaGenerator):
     module_path_map = {'ecore': 'pyecore.ecore'}
 
     def __init__(self, *, user_module=None, auto_register_package=False,
-                 with_dependencies=False, **kwargs):
+                 with_dependencies=False, incremental=False, jobs=1, formatter='autopep8',
+                 template_cache=False, lazy_imports=False, compact_classes=False, flat_init=False,
+                 bulk_factories=False, streaming=False, byte_compile=False, compile_optimize=-1,
+                 invalidation_mode=None, **kwargs):
+        if flat_init and user_module:
+            raise ValueError('flat_init cannot be combined with user_module, as the constructors '
+                             'of the user mixins rely on the chained constructors.')
+        # fail early on unknown or unsupported modes:
+        get_invalidation_mode(invalidation_mode)
+
         self.user_module = user_module
         self.auto_register_package = auto_register_package
         self.with_dependencies = with_dependencies
+        self.incremental = incremental
+        self.jobs = jobs or os.cpu_count() or 1
+        self.formatter = get_formatter(formatter)
+        self.profile = Profile()
+        self.writer = None
+        self.template_cache = template_cache
+        self.lazy_imports = lazy_imports
+        self.compact_classes = compact_classes
+        self.flat_init = flat_init
+        self.bulk_factories = bulk_factories
+        self.streaming = streaming
+        self.byte_compile = byte_compile
+        self.compile_optimize = compile_optimize
+        self.invalidation_mode = invalidation_mode
+
+        # batch formatters are applied by the generator to all files at once:
+        task_formatter = self.formatter
+        if getattr(self.formatter, 'batch', False):
+            task_formatter = multigen.formatter.format_raw
 
         self.tasks = [
-            EcorePackageInitTask(formatter=multigen.formatter.format_autopep8),
-            EcorePackageModuleTask(formatter=multigen.formatter.format_autopep8),
+            EcorePackageInitTask(formatter=task_formatter),
+            EcorePackageModuleTask(formatter=task_formatter),
         ]
         if self.user_module:
-            self.tasks.append(EcorePackageMixinTask(formatter=multigen.formatter.format_autopep8))
+            self.tasks.append(EcorePackageMixinTask(formatter=task_formatter))
+
+        if streaming:
+            line_formatter = get_line_formatter(self.formatter)
+            for task in self.tasks:
+                task.streaming = True
+                task.line_formatter = line_formatter
 
         super().__init__(**kwargs)
 
@@ -182,6 +497,11 @@ class EcoreGenerator(multigen.jinja.JinjaGenerator):
 
     @staticmethod
     def test_opposite_before_self(value: ecore.EReference, references):
+        """
+        Jinja test to check if the opposite of a reference precedes it in references.
+
+        Not used by the built-in templates anymore, kept for custom templates extending them.
+        """
         try:
             return references.index(value.eOpposite) < references.index(value)
         except ValueError:
@@ -193,20 +513,60 @@ class EcoreGenerator(multigen.jinja.JinjaGenerator):
         doc = annotation.details.get('documentation', '') if annotation else None
         return '"""{}"""'.format(doc) if doc else ''
 
+    @staticmethod
+    def linearization(eclass: ecore.EClass):
+        """Returns class followed by its base classes in Python's method resolution order."""
+        sequences = [EcoreGenerator.linearization(s) for s in eclass.eSuperTypes]
+        sequences.append(list(eclass.eSuperTypes))
+        result = [eclass]
+        while any(sequences):
+            sequences = [s for s in sequences if s]
+            head = next(s[0] for s in sequences if not any(s[0] in t[1:] for t in sequences))
+            result.append(head)
+            sequences = [s[1:] if s[0] is head else s for s in sequences]
+        return result
+
+    @classmethod
+    def filter_init_features(cls, value: ecore.EClass):
+        """
+        Returns all features of class in the order the chained constructors would set them.
+
+        `None` is returned if a base class is not generated, as its constructor must be called.
+        """
+        if any(c.ePackage is ecore.eClass for c in cls.linearization(value)):
+            return None
+        return cls.filter_bulk_features(value)
+
+    @classmethod
+    def filter_bulk_features(cls, value: ecore.EClass):
+        """Returns features of class and its generated base classes in constructor order."""
+        features = []
+        for c in reversed(cls.linearization(value)):
+            if c.ePackage is ecore.eClass:
+                continue
+            features.extend(f for f in c.eStructuralFeatures if not isinstance(f, ecore.EReference))
+            features.extend(f for f in c.eStructuralFeatures if isinstance(f, ecore.EReference))
+        return features
+
     @staticmethod
     def filter_supertypes(value: ecore.EClass):
-        supertypes = ', '.join(t.name for t in value.eSuperTypes)
+        supertypes = ', '.join(pythonic_name(t) for t in value.eSuperTypes)
         return supertypes if supertypes else 'EObject, metaclass=MetaEClass'
 
     @staticmethod
     def filter_pyquotesingle(value: str):
         return '\'{}\''.format(value) if value is not None else ''
 
+    @staticmethod
+    def filter_pyname(value: ecore.ENamedElement):
+        """Returns name of element, adapted to not clash with Python keywords."""
+        return pythonic_name(value)
+
     @staticmethod
     def filter_derived_name(value: ecore.EStructuralFeature):
         if value.derived and not value.many:
-            return '_' + value.name
-        return value.name
+            return '_' + pythonic_name(value)
+        return pythonic_name(value)
 
     @staticmethod
     def filter_refqualifiers(value: ecore.EReference):
@@ -219,7 +579,7 @@ class EcoreGenerator(multigen.jinja.JinjaGenerator):
         if value.many:
             qualifiers.update(upper=-1)
         elif value.derived:
-            qualifiers.update(name='{v.name!r}'.format(v=value))
+            qualifiers.update(name=repr(pythonic_name(value)))
         if value.transient:
             qualifiers.update(transient=True)
 
@@ -228,7 +588,7 @@ class EcoreGenerator(multigen.jinja.JinjaGenerator):
     @classmethod
     def filter_attrqualifiers(cls, value: ecore.EAttribute):
         qualifiers = dict(
-            eType=value.eType.name,
+            eType=pythonic_name(value.eType),
             unique=value.unique,
             derived=value.derived,
             changeable=value.changeable,
@@ -238,7 +598,7 @@ class EcoreGenerator(multigen.jinja.JinjaGenerator):
         if value.many:
             qualifiers.update(upper=-1)
         elif value.derived:
-            qualifiers.update(name='{v.name!r}'.format(v=value))
+            qualifiers.update(name=repr(pythonic_name(value)))
         if value.defaultValueLiteral:
             qualifiers.update(default_value=cls.manage_default_value(attribute=value))
         if value.transient:
@@ -250,36 +610,58 @@ class EcoreGenerator(multigen.jinja.JinjaGenerator):
     def manage_default_value(attribute: ecore.EAttribute):
         default_value = attribute.defaultValueLiteral
         if isinstance(attribute.eType, ecore.EEnum):
-            default_value = fix_name_clash(default_value)
-        default_value = attribute.eType.from_string(default_value)
+            # literals are generated with their pythonic names, so the default value is too:
+            name = fix_name_clash(default_value)
+            default_value = next(
+                (e for e in attribute.eType.eLiterals if pythonic_name(e) == name), None
+            )
+        else:
+            default_value = attribute.eType.from_string(default_value)
         if isinstance(default_value, ecore.EEnumLiteral):
-            default_value = '{e.eEnum.name}.{e.name}'.format(e=default_value)
+            default_value = '{}.{}'.format(pythonic_name(default_value.eEnum),
+                                           pythonic_name(default_value))
         elif isinstance(default_value, ecore.EString):
             default_value = '{d!r}'.format(d=default_value)
         return default_value
 
     @staticmethod
-    def filter_all_contents(value: ecore.EPackage, type_):
+    def filter_all_contents(value: ecore.EPackage, type_, index=None):
         """Returns `eAllContents(type_)`."""
-        return (c for c in value.eAllContents() if isinstance(c, type_))
+        contents = index.contents(value, type_) if index else None
+        if contents is None:
+            return (c for c in value.eAllContents() if isinstance(c, type_))
+        return iter(contents)
+
+    @classmethod
+    def filter_pymodule(cls, value, index=None):
+        """Returns absolute Python module path of the module generated for package."""
+        fqn = cls.filter_pyfqn(value, index=index)
+        if fqn in cls.module_path_map.values():
+            return fqn
+        return '{}.{}'.format(fqn, pythonic_name(value))
 
     @classmethod
-    def filter_pyfqn(cls, value, relative_to=0):
+    def filter_pyfqn(cls, value, relative_to=0, index=None):
         """
         Returns Python form of fully qualified name.
 
         Args:
             relative_to: If greater 0, the returned path is relative to the first n directories.
+            index: Optional model index to look up the package path in.
         """
 
         def collect_packages(element, packages):
             parent = element.eContainer()
             if parent:
                 collect_packages(parent, packages)
-            packages.append(element.name)
+            packages.append(pythonic_name(element))
 
-        packages = []
-        collect_packages(value, packages)
+        package_path = index.package_path(value) if index else None
+        if package_path is not None:
+            packages = list(package_path)
+        else:
+            packages = []
+            collect_packages(value, packages)
 
         if relative_to < 0 or relative_to > len(packages):
             raise ValueError('relative_to not in range of number of packages')
@@ -293,15 +675,33 @@ class EcoreGenerator(multigen.jinja.JinjaGenerator):
 
     @staticmethod
     def filter_set(value):
-        """Returns set of passed iterable."""
+        """
+        Returns set of passed iterable.
+
+        Not used by the built-in templates anymore, kept for custom templates extending them.
+        """
         return set(value)
 
     def create_global_context(self, **kwargs):
         return super().create_global_context(
             user_module=self.user_module,
-            auto_register_package=self.auto_register_package
+            auto_register_package=self.auto_register_package,
+            lazy_imports=self.lazy_imports,
+            compact_classes=self.compact_classes,
+            flat_init=self.flat_init,
+            bulk_factories=self.bulk_factories
         )
 
+    @staticmethod
+    def with_index(filter_):
+        """Returns Jinja filter calling `filter_` with the model index of the template context."""
+
+        @pass_context
+        def indexed_filter(context, value, *args, **kwargs):
+            return filter_(value, *args, index=context.get('index'), **kwargs)
+
+        return indexed_filter
+
     def create_environment(self, **kwargs):
         """
         Return a new Jinja environment.
@@ -309,6 +709,10 @@ class EcoreGenerator(multigen.jinja.JinjaGenerator):
         Derived classes may override method to pass additional parameters or to change the template
         loader type.
         """
+        if self.template_cache:
+            directory = self.template_cache if isinstance(self.template_cache, str) else None
+            kwargs.setdefault('bytecode_cache', TemplateCache(directory))
+
         environment = super().create_environment(**kwargs)
         environment.tests.update({
             'type': self.test_type,
@@ -317,13 +721,17 @@ class EcoreGenerator(multigen.jinja.JinjaGenerator):
         })
         environment.filters.update({
             'docstringline': self.filter_docstringline,
+            'pyname': self.filter_pyname,
             'pyquotesingle': self.filter_pyquotesingle,
             'derivedname': self.filter_derived_name,
             'refqualifiers': self.filter_refqualifiers,
             'attrqualifiers': self.filter_attrqualifiers,
             'supertypes': self.filter_supertypes,
-            'all_contents': self.filter_all_contents,
-            'pyfqn': self.filter_pyfqn,
+            'initfeatures': self.filter_init_features,
+            'bulkfeatures': self.filter_bulk_features,
+            'all_contents': self.with_index(self.filter_all_contents),
+            'pyfqn': self.with_index(self.filter_pyfqn),
+            'pymodule': self.with_index(self.filter_pymodule),
             're_sub': lambda v, p, r: re.sub(p, r, v),
             'set': self.filter_set,
         })
@@ -333,27 +741,201 @@ class EcoreGenerator(multigen.jinja.JinjaGenerator):
 
         return environment
 
-    def generate(self, model, outfolder, *, exclude=None):
+    def manifest_salt(self):
+        """Returns a hash over all generator settings that influence the generated code."""
+        sha = hashlib.sha256(pyecoregen.__version__.encode())
+        sha.update(self.__class__.__qualname__.encode())
+        sha.update(getattr(self.formatter, '__qualname__', repr(self.formatter)).encode())
+
+        for dirpath, dirnames, filenames in sorted(os.walk(self.templates_path)):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                sha.update(filename.encode())
+                with open(os.path.join(dirpath, filename), 'rb') as file:
+                    sha.update(file.read())
+
+        for task in self.tasks:
+            settings = (
+                task.__class__.__qualname__,
+                task.template_name,
+                getattr(task.formatter, '__qualname__', repr(task.formatter)),
+                sorted((task.global_context or {}).items()),
+            )
+            sha.update(repr(settings).encode())
+
+        return sha.hexdigest()
+
+    def is_up_to_date(self, package, outfolder, manifest, digest):
+        """Returns whether all files generated for package are present and from the same input."""
+        if not manifest.is_current(qualified_name(package), digest):
+            return False
+        return all(
+            os.path.exists(os.path.join(outfolder, task.relative_path_for_element(package)))
+            for task in self.tasks
+        )
+
+    def models_to_generate(self, model, exclude):
+        """
+        Returns list of models to generate code for.
+
+        Without `with_dependencies` this is just the passed model. Otherwise the dependency graph
+        of the model's resource is built and the root packages of all resources in it are
+        returned, dependencies first. Resources in `exclude` are skipped.
+        """
+        resource = model.eResource
+        if not self.with_dependencies or not resource:
+            return [model]
+
+        graph = ResourceGraph(resource)
+        graph.report()
+        dependencies = [r.contents[0] for r in graph.topological_order()
+                        if r is not resource and r not in exclude]
+        return dependencies + [model]
+
+    def dispatch(self, model):
+        """
+        Yields `(task, element)` tuples of all files to generate for model.
+
+        The elements are collected once for all tasks filtering them the same way, instead of once
+        per task, and each element is passed to these tasks one after the other.
+        """
+        groups = collections.OrderedDict()
+        for task in self.tasks:
+            key = task.element_type, type(task).filtered_elements
+            groups.setdefault(key, []).append(task)
+
+        for tasks in groups.values():
+            for element in tasks[0].filtered_elements(model):
+                for task in tasks:
+                    yield task, element
+
+    def generate(self, model, outfolder, *, exclude=None, writer=None):
         """
         Generate model code.
 
         Args:
             model: The meta-model to generate code for.
-            outfolder: Path to the directoty that will contain the generated code.
+            outfolder: Path to the directoty that will contain the generated code. `None` for
+                paths relative to the output folder, e.g. when generating to memory.
             exclude: List of referenced resources for which code was already generated
-                (to prevent regeneration).
-        """
-        with pythonic_names():
-            super().generate(model, outfolder)
-
-            check_dependency = self.with_dependencies and model.eResource
-            if check_dependency:
-                if exclude is None:
-                    exclude = set()
-                resource = model.eResource
-                # the current resource had been managed and is excluded from further generations
-                exclude.add(resource)
-                rset = resource.resource_set
-                direct_resources = {r for r in rset.resources.values() if r not in exclude}
-                for resource in direct_resources:
-                    self.generate(resource.contents[0], outfolder, exclude=exclude)
+                (to prevent regeneration). The resources generated by this call are added.
+            writer: Writer of the generated files, by default a new `pyecoregen.writer.Writer`
+                writing them to disk.
+        """
+        if outfolder is not None:
+            _logger.info('Generating code to {!r}.'.format(outfolder))
+
+        if exclude is None:
+            exclude = set()
+
+        # only the records of this generation are logged:
+        start = len(self.profile.records)
+        # with dependencies, collecting the models loads the resources of all dependencies:
+        with self.profile.measure('dependencies'):
+            models = self.models_to_generate(model, exclude)
+        with self.profile.measure('index'):
+            index = ModelIndex(*models)
+        self.writer = writer or Writer()
+        contexts = {}
+        for task in self.tasks:
+            task.index = index
+            task.profile = self.profile
+            task.writer = self.writer
+            task.contexts = contexts
+
+        manifest = None
+        skipped = set()
+        if self.incremental and outfolder is not None:
+            with self.profile.measure('manifest'):
+                manifest = Manifest(outfolder, self.manifest_salt())
+                digests = {}
+                for m in models:
+                    digests.update(package_digests(m, manifest.salt))
+                skipped = {p for p, d in digests.items()
+                           if self.is_up_to_date(p, outfolder, manifest, d)}
+            _logger.info('Skipping {} unchanged package(s).'.format(len(skipped)))
+
+        # all packages of all models are rendered in the same worker pool, so independent
+        # metamodels are generated in parallel:
+        work = [(task, element) for m in models for task, element in self.dispatch(m)
+                if element not in skipped]
+
+        # load templates before forking any workers, so they are not compiled in each of them:
+        with self.profile.measure('templates'):
+            for task in self.tasks:
+                task.environment.get_template(task.template_name)
+
+        if self.streaming:
+            # each file is rendered while writing it:
+            codes = itertools.repeat(None)
+        else:
+            codes = render_all(work, self.jobs)
+            if getattr(self.formatter, 'batch', False):
+                codes = list(codes)
+                with self.profile.measure('format'):
+                    codes = self.formatter(codes, jobs=self.jobs)
+
+        for (task, element), code in zip(work, codes):
+            task.run(element, outfolder, code)
+
+        if manifest:
+            for package, digest in digests.items():
+                manifest.update(qualified_name(package), digest)
+            manifest.save()
+
+        if self.byte_compile and outfolder is not None:
+            self.compile_bytecode(models, outfolder)
+
+        exclude.update(m.eResource for m in models if m.eResource)
+        for task in self.tasks:
+            task.contexts = None
+        self.writer.log()
+        self.profile.log(start)
+
+    def compile_bytecode(self, models, outfolder):
+        """
+        Compiles the modules generated for models in outfolder to bytecode files.
+
+        The modules of skipped packages are included, so their bytecode files are written once
+        byte-compilation is enabled. Bytecode files with timestamps that still match their module
+        are not compiled again.
+        """
+        paths = []
+        for m in models:
+            for task, element in self.dispatch(m):
+                filepath = task.relative_path_for_element(element)
+                if not os.path.isabs(filepath):
+                    filepath = os.path.join(outfolder, filepath)
+                paths.append(filepath)
+
+        with self.profile.measure('compile'):
+            compile_all(paths, self.jobs, self.compile_optimize,
+                        get_invalidation_mode(self.invalidation_mode))
+
+    def generate_sources(self, model):
+        """
+        Returns the code generated for model, by path relative to the output folder.
+
+        No file is written, the code is generated to memory. With `with_dependencies`, the code of
+        the model's dependencies is included. Incremental generation does not apply.
+        """
+        _logger.info('Generating code to memory.')
+        writer = MemoryWriter()
+        self.generate(model, None, writer=writer)
+        return writer.files
+
+    def generate_many(self, models, outfolder):
+        """
+        Generate code for several models into the same folder.
+
+        Each resource is generated only once: dependencies shared by several models are skipped
+        after their first generation, as are models already generated as dependency of a previous
+        model. Load the models into the same resource set, so shared dependencies are also parsed
+        only once.
+        """
+        exclude = set()
+        for model in models:
+            if model.eResource is not None and model.eResource in exclude:
+                _logger.info('Skipping {!r}, already generated.'.format(qualified_name(model)))
+                continue
+            self.generate(model, outfolder, exclude=exclude)
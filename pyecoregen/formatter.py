@@ -0,0 +1,169 @@
+"""
+Code formatters for the generated files.
+
+In addition to the per-file formatters of `multigen.formatter`, this module provides a fast
+formatter, which only normalizes the whitespace produced by the templates, and a parallel
+formatter, which formats the code of all generated files with autopep8 in worker processes.
+Formatters working line by line can also format code streamed to the generated files, see
+`get_line_formatter`.
+"""
+import multiprocessing
+
+import multigen.formatter
+
+MAX_LINE_LENGTH = 100
+
+_DEFINITION_PREFIXES = ('def ', 'async def ', 'class ', '@')
+
+
+def normalize_lines(lines):
+    """
+    Yields given lines of generated code with PEP8 conform whitespace.
+
+    The templates produce valid code, but leave trailing whitespace and arbitrary numbers of blank
+    lines. This single pass strips the former and emits the blank lines PEP8 expects around
+    definitions: two at module level and at most one within blocks. Long lines are not wrapped and
+    the content of multi-line strings is kept as is.
+    """
+    blank_lines = 0
+    previous = None
+    in_definition = False
+    in_string = False
+
+    for line in lines:
+        if in_string:
+            in_string = not _toggles_string(line)
+            yield line if in_string else line.rstrip()
+            continue
+
+        opens_string = _toggles_string(line)
+        if not opens_string:
+            line = line.rstrip()
+        if not line.strip():
+            blank_lines += 1
+            continue
+
+        stripped = line.lstrip()
+        indented = line[0] in ' \t'
+        definition = stripped.startswith(_DEFINITION_PREFIXES)
+
+        if previous is None:
+            # no blank lines at start of file:
+            blank_lines = 0
+        elif previous.lstrip().startswith('@'):
+            # no blank lines between decorator and definition:
+            blank_lines = 0
+        elif not indented:
+            if definition or in_definition:
+                blank_lines = 2
+            blank_lines = min(blank_lines, 2)
+            in_definition = definition
+        else:
+            if definition and not blank_lines and not _opens_block(previous, line):
+                blank_lines = 1
+            blank_lines = min(blank_lines, 1)
+
+        for _ in range(blank_lines):
+            yield ''
+        yield line
+
+        in_string = opens_string
+        blank_lines = 0
+        previous = line
+
+
+def _toggles_string(line):
+    """Returns whether line opens or closes a multi-line string."""
+    return line.count('"""') % 2 == 1 or line.count("'''") % 2 == 1
+
+
+def _opens_block(previous, line):
+    """Returns whether line is the first one in a block or preceded by a docstring."""
+    previous_indent = len(previous) - len(previous.lstrip())
+    indent = len(line) - len(line.lstrip())
+    return previous_indent < indent or previous.lstrip().startswith(('"""', "'''"))
+
+
+def format_fast(raw: str) -> str:
+    """
+    Returns raw template output with normalized whitespace, see `normalize_lines`.
+
+    The output is not fully PEP 8 clean, as long lines are not wrapped.
+    """
+    code = '\n'.join(normalize_lines(raw.splitlines()))
+    return code + '\n' if code else code
+
+
+# line by line variant used when streaming the generated code:
+format_fast.lines = normalize_lines
+
+
+def _autopep8_options():
+    import autopep8
+    return autopep8.parse_args([''] + ['--max-line-length', str(MAX_LINE_LENGTH)])
+
+
+def _fix_code(raw):
+    import autopep8
+    return autopep8.fix_code(raw, _fix_code.options)
+
+
+def format_autopep8_parallel(raws, jobs=1):
+    """
+    Returns the autopep8 formatted code of all passed raw strings.
+
+    autopep8 still formats each file on its own, but its options are set up only once for all
+    files. With more than one job, the files are formatted in a pool of worker processes.
+    """
+    _fix_code.options = _autopep8_options()
+
+    if jobs < 2 or len(raws) < 2:
+        return [_fix_code(raw) for raw in raws]
+
+    with multiprocessing.Pool(min(jobs, len(raws)), initializer=_init_worker) as pool:
+        return pool.map(_fix_code, raws)
+
+
+def _init_worker():
+    _fix_code.options = _autopep8_options()
+
+
+# marker telling the generator to collect all files and to pass them in a single call:
+format_autopep8_parallel.batch = True
+
+FORMATTERS = {
+    'autopep8': multigen.formatter.format_autopep8,
+    'parallel': format_autopep8_parallel,
+    'fast': format_fast,
+    'raw': multigen.formatter.format_raw,
+}
+
+
+def get_formatter(formatter):
+    """Returns formatter for given name, or formatter itself if it is already a callable."""
+    if callable(formatter):
+        return formatter
+    try:
+        return FORMATTERS[formatter]
+    except KeyError:
+        raise ValueError('Unknown formatter {!r}, expected one of {}.'.format(
+            formatter, ', '.join(sorted(FORMATTERS))
+        )) from None
+
+
+def get_line_formatter(formatter):
+    """
+    Returns function formatting code line by line like formatter, or `None` for the raw formatter.
+
+    The function is passed an iterable of lines without line endings and returns an iterable of
+    formatted lines. Formatters needing the whole code of a file cannot be applied line by line and
+    raise a `ValueError`.
+    """
+    if formatter is multigen.formatter.format_raw:
+        return None
+    try:
+        return formatter.lines
+    except AttributeError:
+        raise ValueError('Formatter {!r} cannot format streamed code, use {!r} or {!r}.'.format(
+            getattr(formatter, '__name__', formatter), 'fast', 'raw'
+        )) from None
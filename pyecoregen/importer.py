@@ -0,0 +1,155 @@
+"""Import hook importing Ecore metamodels as packages generated in memory."""
+import hashlib
+import importlib.abc
+import importlib.util
+import logging
+import os
+import sys
+
+import pyecore.resources
+from pyecoregen.adapter import pythonic_name
+from pyecoregen.ecore import EcoreGenerator
+from pyecoregen.manifest import package_digests
+
+_logger = logging.getLogger(__name__)
+
+# Compiled generated modules by hash of generator settings and metamodel, shared by all finders:
+_compiled = {}
+
+
+def module_name(path):
+    """Returns name of the module generated to relative path, `None` if not a Python module."""
+    root, extension = os.path.splitext(path)
+    if extension != '.py':
+        return None
+    names = root.split(os.sep)
+    if names[-1] == '__init__':
+        names.pop()
+    return '.'.join(names)
+
+
+class GeneratedModule:
+    """
+    Compiled code of a module generated in memory.
+
+    Attributes:
+        filename: Virtual path of the module, the relative path of the generated file below the
+            absolute path of the Ecore file. Used as `__file__` and in tracebacks, which show the
+            lines of the source, as does `inspect`.
+        source: Generated code.
+        code: Compiled code.
+        is_package: Whether the module is the init module of a package.
+    """
+
+    def __init__(self, filename, source, is_package):
+        self.filename = filename
+        self.source = source
+        self.code = compile(source, filename, 'exec', dont_inherit=True)
+        self.is_package = is_package
+
+
+class GeneratedModuleLoader(importlib.abc.InspectLoader):
+    """Loader of a module generated in memory."""
+
+    def __init__(self, module):
+        self.module = module
+
+    def is_package(self, fullname):
+        return self.module.is_package
+
+    def get_source(self, fullname):
+        return self.module.source
+
+    def get_code(self, fullname):
+        return self.module.code
+
+
+class EcoreFinder(importlib.abc.MetaPathFinder):
+    """
+    Finder importing the packages generated for Ecore files, without writing any file.
+
+    The Ecore files are loaded on the first import looking for a module, their code is generated
+    and compiled in memory on the first import of one of their packages. Compiled modules are kept
+    for the lifetime of the interpreter by hash of the generator settings and of the metamodel, so
+    further finders of the same, unchanged metamodel do not generate it again.
+
+    Attributes:
+        paths: Paths of the Ecore files.
+        generator: Generator of the code, by default generating dependencies and skipping
+            formatting, as the code is compiled right away.
+        resource_set: Resource set the Ecore files are loaded into.
+    """
+
+    def __init__(self, paths, generator=None, resource_set=None):
+        self.paths = list(paths)
+        self.generator = generator or EcoreGenerator(with_dependencies=True, formatter='raw')
+        self.resource_set = resource_set or pyecore.resources.ResourceSet()
+        self._models = None
+        self._modules = {}
+
+    def models(self):
+        """Returns root packages of Ecore files by name of their generated package."""
+        if self._models is None:
+            self._models = {}
+            for path in self.paths:
+                uri = pyecore.resources.URI(path)
+                model = self.resource_set.get_resource(uri).contents[0]
+                for generated in self.generator.models_to_generate(model, set()):
+                    self._models.setdefault(pythonic_name(generated), model)
+        return self._models
+
+    def model_key(self, model):
+        """Returns hash of generator settings and of the packages generated for model."""
+        salt = self.generator.manifest_salt()
+        sha = hashlib.sha256(salt.encode())
+        for generated in self.generator.models_to_generate(model, set()):
+            for digest in sorted(package_digests(generated, salt).values()):
+                sha.update(digest.encode())
+        return sha.hexdigest()
+
+    def generate(self, model):
+        """Generates and compiles the code of model, unless already compiled."""
+        key = self.model_key(model)
+        modules = _compiled.get(key)
+        if modules is None:
+            folder = os.path.abspath(model.eResource.uri.plain if model.eResource
+                                     else pythonic_name(model))
+            modules = {}
+            for path, source in self.generator.generate_sources(model).items():
+                name = module_name(path)
+                if name is not None:
+                    is_package = os.path.basename(path) == '__init__.py'
+                    modules[name] = GeneratedModule(os.path.join(folder, path), source, is_package)
+            _compiled[key] = modules
+        for name, module in modules.items():
+            self._modules.setdefault(name, module)
+
+    def find_spec(self, fullname, path=None, target=None):
+        package = fullname.partition('.')[0]
+        model = self.models().get(package)
+        if model is None:
+            return None
+        if package not in self._modules:
+            _logger.debug('Generating {!r} for import of {!r}.'.format(package, fullname))
+            self.generate(model)
+
+        module = self._modules.get(fullname)
+        if module is None:
+            return None
+        spec = importlib.util.spec_from_loader(fullname, GeneratedModuleLoader(module),
+                                               origin=module.filename,
+                                               is_package=module.is_package)
+        # sets `__file__`, even though no file exists:
+        spec.has_location = True
+        return spec
+
+
+def install(paths, generator=None, resource_set=None):
+    """
+    Installs finder importing the packages generated for Ecore files, returns the finder.
+
+    The finder is placed first in `sys.meta_path`, remove it from there to uninstall it.
+    """
+    finder = EcoreFinder(paths, generator, resource_set)
+    sys.meta_path.insert(0, finder)
+    return finder
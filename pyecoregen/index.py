@@ -0,0 +1,81 @@
+"""Precomputed lookups on a model, shared by all tasks and filters of a generation."""
+import os
+
+from pyecore import ecore
+from pyecoregen.adapter import pythonic_name
+
+
+class ModelIndex:
+    """
+    Index of a model, built in a single walk over all its elements.
+
+    Lookups for elements outside of the indexed model return `None`, callers then fall back to
+    walking the model themselves.
+
+    Attributes:
+        model: Root element of indexed model.
+        models: All indexed models, the first one being `model`. Several models are indexed
+            together if they are generated together, e.g. metamodels and their dependencies.
+    """
+
+    def __init__(self, model, *models):
+        self.model = model
+        self.models = (model,) + models
+        self._children = {}
+        self._contents_by_type = {}
+        self._package_paths = {}
+
+        for model in self.models:
+            # the model may be a subpackage, so paths start with the names of its containers:
+            container_path = ()
+            container = model.eContainer()
+            while isinstance(container, ecore.EObject):
+                container_path = (pythonic_name(container),) + container_path
+                container = container.eContainer()
+
+            self._walk(model, container_path)
+
+    def _walk(self, element, package_path):
+        if isinstance(element, ecore.EPackage):
+            package_path += (pythonic_name(element),)
+            self._package_paths[element] = package_path
+
+        children = element.eContents
+        self._children[element] = children
+        for child in children:
+            self._walk(child, package_path)
+
+    def _all_contents(self, element):
+        # same order as `eAllContents`: all children first, then the contents of each child
+        children = self._children[element]
+        contents = list(children)
+        for child in children:
+            contents.extend(self._all_contents(child))
+        return contents
+
+    def contents(self, element, type_):
+        """
+        Returns all direct and indirect contents of element with given type.
+
+        The contents are ordered like the ones of `eAllContents`. If element is not part of the
+        model, `None` is returned.
+        """
+        key = element, type_
+        try:
+            return self._contents_by_type[key]
+        except KeyError:
+            pass
+        if element not in self._children:
+            return None
+        contents = [e for e in self._all_contents(element) if isinstance(e, type_)]
+        self._contents_by_type[key] = contents
+        return contents
+
+    def package_path(self, package):
+        """Returns tuple of pythonic names of all packages from the root down to package."""
+        return self._package_paths.get(package)
+
+    def folder_path(self, package):
+        """Returns path of folder holding the files generated for package."""
+        package_path = self._package_paths.get(package)
+        return os.path.join(*package_path) if package_path else None
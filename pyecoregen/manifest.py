@@ -0,0 +1,167 @@
+"""Content-hash manifest supporting incremental generation."""
+import hashlib
+import json
+import logging
+import os
+
+from pyecore import ecore
+
+_logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = '.pyecoregen-manifest.json'
+
+
+def qualified_name(element: ecore.ENamedElement):
+    """Returns dotted name of element, prefixed by the names of all its containers."""
+    names = []
+    while element is not None:
+        names.append(element.name or '')
+        # static classifiers like EString are contained in the Python module of their package:
+        element = element.eContainer() if isinstance(element, ecore.EObject) else None
+    return '.'.join(reversed(names))
+
+
+def _annotations(element: ecore.EModelElement):
+    for annotation in element.eAnnotations:
+        yield 'annotation', annotation.source, sorted(annotation.details.items())
+
+
+def _typed(element: ecore.ETypedElement):
+    etype = element.eType
+    return (
+        element.name,
+        qualified_name(etype) if etype is not None else None,
+        element.lowerBound,
+        element.upperBound,
+        element.ordered,
+        element.unique,
+    )
+
+
+def _describe_feature(feature: ecore.EStructuralFeature):
+    description = [
+        feature.__class__.__name__,
+        _typed(feature),
+        feature.changeable,
+        feature.derived,
+        feature.transient,
+        feature.defaultValueLiteral,
+    ]
+    if isinstance(feature, ecore.EAttribute):
+        description.append(feature.iD)
+    else:
+        opposite = feature.eOpposite
+        description.append(feature.containment)
+        description.append(qualified_name(opposite) if opposite is not None else None)
+    yield description
+    yield from _annotations(feature)
+
+
+def _describe_operation(operation: ecore.EOperation):
+    yield 'operation', _typed(operation)
+    for parameter in operation.eParameters:
+        yield 'parameter', _typed(parameter), parameter.required
+    yield from _annotations(operation)
+
+
+def _describe_classifier(classifier: ecore.EClassifier):
+    yield classifier.__class__.__name__, classifier.name, classifier.instanceClassName
+    yield from _annotations(classifier)
+
+    if isinstance(classifier, ecore.EEnum):
+        for literal in classifier.eLiterals:
+            yield 'literal', literal.name, literal.value
+    elif isinstance(classifier, ecore.EClass):
+        yield 'class', classifier.abstract, classifier.interface
+        yield 'supertypes', [qualified_name(t) for t in classifier.eSuperTypes]
+        for feature in classifier.eStructuralFeatures:
+            yield from _describe_feature(feature)
+        for operation in classifier.eOperations:
+            yield from _describe_operation(operation)
+
+
+def _describe_package(package: ecore.EPackage):
+    super_package = package.eSuperPackage
+    yield (
+        'package',
+        qualified_name(package),
+        package.nsURI,
+        package.nsPrefix,
+        super_package.name if super_package is not None else None,
+        [p.name for p in package.eSubpackages],
+    )
+    yield from _annotations(package)
+    for classifier in package.eClassifiers:
+        yield from _describe_classifier(classifier)
+
+
+def package_digests(model: ecore.EPackage, salt=''):
+    """
+    Returns content hashes for given package and all its subpackages.
+
+    The hash of a package covers all information the templates read from it: its classifiers, their
+    features and operations and the qualified names of all referenced types, i.e. the package's
+    dependencies. As the init module of a root package wires references of the whole package tree,
+    the hash of a root package additionally covers the hashes of all its subpackages.
+
+    Args:
+        model: Package to compute hashes for.
+        salt: String identifying the generator settings, included in each hash.
+    """
+    digests = {}
+
+    def digest(package):
+        sha = hashlib.sha256(salt.encode())
+        for item in _describe_package(package):
+            sha.update(repr(item).encode())
+        sub_digests = [digest(p) for p in package.eSubpackages]
+        if package.eSuperPackage is None:
+            for sub_digest in sub_digests:
+                sha.update(sub_digest.encode())
+        digests[package] = sha.hexdigest()
+        return digests[package]
+
+    digest(model)
+    return digests
+
+
+class Manifest:
+    """
+    Record of the content hashes of all packages generated into an output folder.
+
+    Attributes:
+        path: Path to manifest file.
+        salt: String identifying the generator settings. If a loaded manifest was written with a
+            different salt, all of its records are discarded.
+        packages: Mapping of qualified package name to content hash.
+    """
+
+    def __init__(self, outfolder, salt=''):
+        self.path = os.path.join(outfolder, MANIFEST_FILENAME)
+        self.salt = salt
+        self.packages = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'rt') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        if data.get('salt') != self.salt:
+            _logger.debug('Generator settings changed, discarding manifest {!r}.'.format(self.path))
+            return
+        self.packages = data.get('packages', {})
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'wt') as file:
+            json.dump(dict(salt=self.salt, packages=self.packages), file, indent=2, sort_keys=True)
+
+    def is_current(self, name, digest):
+        """Returns whether package with given qualified name was generated with given hash."""
+        return self.packages.get(name) == digest
+
+    def update(self, name, digest):
+        self.packages[name] = digest
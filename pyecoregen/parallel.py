@@ -0,0 +1,60 @@
+"""Rendering of generator tasks in parallel worker processes."""
+import logging
+import multiprocessing
+import threading
+
+_logger = logging.getLogger(__name__)
+
+# Work items of the current parallel run, inherited by the forked worker processes. Model elements
+# are not picklable, so workers only receive indices into this list.
+_work = None
+_work_lock = threading.Lock()
+
+
+def _render(index):
+    task, element = _work[index]
+    if task.profile is None:
+        return task.render(element), []
+
+    # the records of the worker's copy of the profile are passed back to the parent process:
+    start = len(task.profile.records)
+    code = task.render(element)
+    return code, task.profile.records[start:]
+
+
+def parallel_supported():
+    """Returns whether worker processes can inherit the model, which requires forking."""
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+
+def render_all(work, jobs):
+    """
+    Yields the rendered code of all work items, in order of the items.
+
+    Args:
+        work: List of `(task, element)` tuples.
+        jobs: Number of worker processes to render with.
+    """
+    global _work
+
+    if jobs < 2 or len(work) < 2 or not parallel_supported():
+        for task, element in work:
+            yield task.render(element)
+        return
+
+    jobs = min(jobs, len(work))
+    _logger.debug('Rendering {} files in {} worker processes.'.format(len(work), jobs))
+
+    with _work_lock:
+        _work = work
+        try:
+            # workers are forked right away and take a snapshot of the work items:
+            pool = multiprocessing.get_context('fork').Pool(jobs)
+        finally:
+            _work = None
+
+    with pool:
+        for (task, _), (code, records) in zip(work, pool.imap(_render, range(len(work)))):
+            if records:
+                task.profile.records.extend(records)
+            yield code
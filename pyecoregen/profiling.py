@@ -0,0 +1,102 @@
+"""Timing of the phases of a generation, per task and package."""
+import collections
+import contextlib
+import json
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+Record = collections.namedtuple('Record', 'phase seconds task package')
+
+
+class Profile:
+    """
+    Durations of the phases of one or more generations.
+
+    Tasks record the phases of generating a single file (`context`, `render`, `format` and
+    `write`), the generator records phases applying to all files, like building the model index or
+    formatting all files in a batch. Records hold plain strings only, so they can be passed back
+    from worker processes.
+
+    Records are kept until cleared, so a report can cover several generations, while the logged
+    summary of a generation only covers the records added since its start.
+
+    Attributes:
+        records: List of all recorded `Record` tuples.
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def clear(self):
+        """Removes all records."""
+        del self.records[:]
+
+    def add(self, phase, seconds, task=None, package=None):
+        """Records duration of phase, optionally for a task and package name."""
+        self.records.append(Record(phase, seconds, task, package))
+
+    @contextlib.contextmanager
+    def measure(self, phase, task=None, package=None):
+        """Context manager recording duration of its body as given phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start, task, package)
+
+    @staticmethod
+    def _sum(records, key):
+        sums = collections.OrderedDict()
+        for record in records:
+            name = key(record)
+            sums.setdefault(name, collections.OrderedDict())
+            sums[name][record.phase] = sums[name].get(record.phase, 0.0) + record.seconds
+        return sums
+
+    def report(self, start=0):
+        """
+        Returns report of records as dictionary that can be serialized to JSON.
+
+        The report holds the summed durations per phase, the durations per phase of each task and
+        of each package, and the records. Packages are sorted by their total duration, slowest
+        first.
+
+        Args:
+            start: Index of the first record to report, e.g. the number of records before a
+                generation to only report that generation.
+        """
+        records = self.records[start:]
+        phases = collections.OrderedDict()
+        for record in records:
+            phases[record.phase] = phases.get(record.phase, 0.0) + record.seconds
+
+        packages = self._sum((r for r in records if r.package), lambda r: r.package)
+        packages = collections.OrderedDict(
+            sorted(packages.items(), key=lambda item: sum(item[1].values()), reverse=True)
+        )
+
+        return collections.OrderedDict([
+            ('phases', phases),
+            ('tasks', self._sum((r for r in records if r.task), lambda r: r.task)),
+            ('packages', packages),
+            ('records', [r._asdict() for r in records]),
+        ])
+
+    def save(self, path):
+        """Writes report to JSON file."""
+        with open(path, 'w') as file:
+            json.dump(self.report(), file, indent=2)
+            file.write('\n')
+
+    def log(self, start=0):
+        """Logs durations per phase at info level and per package at debug level."""
+        report = self.report(start)
+        _logger.info('Phase durations: {}.'.format(self._format(report['phases'])))
+        for package, phases in report['packages'].items():
+            _logger.debug('Package {!r}: {}.'.format(package, self._format(phases)))
+
+    @staticmethod
+    def _format(phases):
+        return ', '.join('{} {:.3f}s'.format(p, s) for p, s in phases.items())
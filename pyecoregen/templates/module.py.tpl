@@ -1,23 +1,39 @@
 {% import 'module_utilities.tpl' as modutil with context -%}
-"""Definition of meta model '{{ element.name }}'."""
-from functools import partial
+"""Definition of meta model '{{ element | pyname }}'."""
 import pyecore.ecore as Ecore
 from pyecore.ecore import *
 {% for package, classifs in imported_classifiers.items() -%}
-    from {{ package|pyfqn }} import {{ classifs|map(attribute='name')|join(', ') }}
+    from {{ package|pyfqn }} import {{ classifs|map('pyname')|join(', ') }}
 {% endfor -%}
 {% if user_module -%}
     import {{ user_module }} as _user_module
 {% endif %}
+{%- if compact_classes -%}
+    from pyecore.notification import Notification, Kind
+{% endif %}
+{%- if bulk_factories -%}
+    from itertools import repeat
+{% endif %}
 
-name = '{{ element.name }}'
+name = '{{ element | pyname }}'
 nsURI = '{{ element.nsURI | default(boolean=True) }}'
 nsPrefix = '{{ element.nsPrefix | default(boolean=True) }}'
 
 eClass = EPackage(name=name, nsURI=nsURI, nsPrefix=nsPrefix)
 
 eClassifiers = {}
-getEClassifier = partial(Ecore.getEClassifier, searchspace=eClassifiers)
+
+
+def getEClassifier(name):
+    """Returns classifier of this package with given name, `None` if not found."""
+    return eClassifiers.get(name)
+
+{%- if compact_classes and classes %}
+{{ modutil.generate_compact_mixin() }}
+{%- endif %}
+{%- if bulk_factories and classes %}
+{{ modutil.generate_bulk_helpers() }}
+{%- endif %}
 
 {%- for c in element.eClassifiers if c is type(ecore.EEnum) -%}
 {{ modutil.generate_enum(c) }}
@@ -29,3 +45,31 @@ getEClassifier = partial(Ecore.getEClassifier, searchspace=eClassifiers)
 {%- for c in classes -%}
 {{ modutil.generate_class(c) }}
 {%- endfor %}
+{%- if lazy_imports %}
+{% if references %}
+
+
+def _wire_references():
+    """Wires references after all classes are defined, so modules can import each other."""
+    {%- for package, classifs in referenced_classifiers.items() %}
+    from {{ package|pymodule }} import {{ classifs|map('pyname')|join(', ') }}
+    {%- endfor %}
+    {%- for e, wire_opposite in references %}
+    {{ e.eContainingClass | pyname }}.{{ e | derivedname }}.eType = {{ e.eType | pyname }}
+        {%- if wire_opposite %}
+    {{ e.eContainingClass | pyname }}.{{ e | derivedname }}.eOpposite = {{ e.eOpposite.eContainingClass | pyname }}.{{ e.eOpposite | derivedname }}
+        {%- endif %}
+    {%- endfor %}
+
+
+_wire_references()
+{% endif %}
+
+
+def __getattr__(name):
+    """Loads subpackages on first access of `eSubpackages`, e.g. by the XMI resolver."""
+    if name == 'eSubpackages':
+        import importlib
+        return importlib.import_module(__package__).eSubpackages
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+{%- endif %}
@@ -1,18 +1,19 @@
 {%- macro generate_enum(e) %}
-{{ e.name }} = EEnum('{{ e.name }}', literals=[{{ e.eLiterals | map(attribute='name') | map('pyquotesingle') | join(', ') }}])
+{{ e | pyname }} = EEnum('{{ e | pyname }}', literals=[{{ e.eLiterals | map('pyname') | map('pyquotesingle') | join(', ') }}])
 {% endmacro %}
 
 {#- -------------------------------------------------------------------------------------------- -#}
 
 {%- macro generate_edatatype(e) %}
-{{ e.name }} = EDataType('{{ e.name }}', instanceClassName='{{ e.instanceClassName }}')
+{{ e | pyname }} = EDataType('{{ e | pyname }}', instanceClassName='{{ e.instanceClassName }}')
 {% endmacro %}
 
 {#- -------------------------------------------------------------------------------------------- -#}
 
 {%- macro generate_class_header(c) -%}
-class {{ c.name }}(
-    {%- if user_module %}_user_module.{{ c.name }}Mixin, {% endif -%}
+class {{ c | pyname }}(
+    {%- if user_module %}_user_module.{{ c | pyname }}Mixin, {% endif -%}
+    {%- if compact_classes and not c.eSuperTypes %}_CompactAttributes, {% endif -%}
     {{ c | supertypes -}}
 ):
     {{ c | docstringline -}}
@@ -21,8 +22,8 @@ class {{ c.name }}(
 {#- -------------------------------------------------------------------------------------------- -#}
 
 {%- macro generate_mixin_header(c) -%}
-class {{ c.name }}Mixin:
-    """User defined mixin class for {{ c.name }}."""
+class {{ c | pyname }}Mixin:
+    """User defined mixin class for {{ c | pyname }}."""
 {% endmacro -%}
 
 {#- -------------------------------------------------------------------------------------------- -#}
@@ -40,21 +41,21 @@ class {{ c.name }}Mixin:
 {%- endmacro %}
 
 {%- macro generate_derived_fragment(f) -%}
-derived_class={% if user_module %}_user_module.{% endif %}Derived{{ f.name | capitalize }}
+derived_class={% if user_module %}_user_module.{% endif %}Derived{{ f | pyname | capitalize }}
 {%- endmacro -%}
 
 {#- -------------------------------------------------------------------------------------------- -#}
 
 {%- macro generate_derived_single(d) -%}
     @property
-    def {{ d.name }}(self):
-        raise NotImplementedError('Missing implementation for {{ d.name }}')
+    def {{ d | pyname }}(self):
+        raise NotImplementedError('Missing implementation for {{ d | pyname }}')
 
     {%- if d.changeable %}
 
-    @{{ d.name }}.setter
-    def {{ d.name }}(self, value):
-        raise NotImplementedError('Missing implementation for {{ d.name }}')
+    @{{ d | pyname }}.setter
+    def {{ d | pyname }}(self, value):
+        raise NotImplementedError('Missing implementation for {{ d | pyname }}')
     {% endif %}
 {%- endmacro %}
 
@@ -62,7 +63,7 @@ derived_class={% if user_module %}_user_module.{% endif %}Derived{{ f.name | cap
 
 {%- macro generate_derived_collection(d) -%}
 
-class Derived{{ d.name | capitalize }}(EDerivedCollection):
+class Derived{{ d | pyname | capitalize }}(EDerivedCollection):
     pass
 {%- endmacro %}
 
@@ -70,24 +71,92 @@ class Derived{{ d.name | capitalize }}(EDerivedCollection):
 
 {%- macro generate_class_init_args(c) -%}
     {% if c.eStructuralFeatures %}, *, {% endif -%}
-    {{ c.eStructuralFeatures | map(attribute='name') | map('re_sub', '$', '=None') | join(', ') }}
+    {{ c.eStructuralFeatures | map('pyname') | map('re_sub', '$', '=None') | join(', ') }}
 {%- endmacro %}
 
 {#- -------------------------------------------------------------------------------------------- -#}
 
-{%- macro generate_feature_init(feature) %}
+{%- macro generate_feature_init(feature, target='self', value=None) %}
+    {%- set value = value or feature | pyname %}
     {%- if feature.upperBound == 1 %}
-        if {{ feature.name }} is not None:
-            self.{{ feature.name }} = {{ feature.name }}
+        if {{ value }} is not None:
+            {{ target }}.{{ feature | pyname }} = {{ value }}
     {%- else %}
-        if {{ feature.name }}:
-            self.{{ feature.name }}.extend({{ feature.name }})
+        if {{ value }}:
+            {{ target }}.{{ feature | pyname }}.extend({{ value }})
     {%- endif %}
 {%- endmacro %}
 
 {#- -------------------------------------------------------------------------------------------- -#}
 
+{%- macro generate_compact_mixin() %}
+
+
+class _CompactAttributes:
+    """
+    Mixin storing values of single-valued attributes without value container.
+
+    The value is stored directly in the instance dictionary, which pyecore's feature descriptors
+    read as is. Type checks, notifications and `eIsSet` behave as for other features.
+    """
+
+    _compact_attributes = {}
+
+    def __setattr__(self, name, value):
+        feature = self._compact_attributes.get(name)
+        previous = self.__dict__.get(name, _unset)
+        if feature is None or hasattr(previous, '_get'):
+            # not compact or value container already created, e.g. by reading unset attribute:
+            super().__setattr__(name, value)
+            return
+
+        if not Ecore.EcoreUtils.isinstance(value, feature.eType):
+            raise Ecore.BadValueError(value, feature.eType, feature)
+        if previous is _unset:
+            previous = feature.get_default_value()
+
+        self.__dict__[name] = value
+        self.notify(Notification(old=previous, new=value, feature=feature,
+                                 kind=Kind.UNSET if value is None else Kind.SET))
+        # `_isset` is a set in older pyecore versions and a dict with `add` in newer ones:
+        self._isset.add(feature)
+
+
+_unset = object()
+{% endmacro %}
+
+{#- -------------------------------------------------------------------------------------------- -#}
+
+{%- macro generate_compact_attributes(c) %}
+    {%- set attributes = c.eAttributes | rejectattr('many') | rejectattr('derived') | list %}
+    {%- if attributes or c.eSuperTypes | length > 1 %}
+
+    _compact_attributes = {
+        {%- for s in c.eSuperTypes %}**getattr({{ s | pyname }}, '_compact_attributes', {}), {% endfor %}
+        {%- for a in attributes %}'{{ a | pyname }}': {{ a | pyname }}{% if not loop.last %}, {% endif %}{% endfor -%}
+    }
+    {%- endif %}
+{%- endmacro %}
+
+{#- -------------------------------------------------------------------------------------------- -#}
+
+{%- macro generate_flat_class_init(c, features) %}
+    def __init__(self{% if features %}, *, {% endif %}
+        {{- features | map('pyname') | map('re_sub', '$', '=None') | join(', ') }}):
+        # flattened constructor, setting the features of all base classes:
+        EObject.__init__(self)
+    {%- for feature in features %}
+    {{ generate_feature_init(feature) }}
+    {%- endfor %}
+{%- endmacro %}
+
+{#- -------------------------------------------------------------------------------------------- -#}
+
 {%- macro generate_class_init(c) %}
+{%- set features = c | initfeatures if flat_init and c.eSuperTypes else None %}
+{%- if features is not none %}
+{{- generate_flat_class_init(c, features) }}
+{%- else %}
     def __init__(self{{ generate_class_init_args(c) }}{% if c.eSuperTypes %}, **kwargs{% endif %}):
     {%- if not c.eSuperTypes %}
         # if kwargs:
@@ -101,6 +170,63 @@ class Derived{{ d.name | capitalize }}(EDerivedCollection):
     {%- for feature in c.eStructuralFeatures | select('type', ecore.EReference) %}
     {{ generate_feature_init(feature) }}
     {%- endfor %}
+{%- endif %}
+{%- endmacro %}
+
+{#- -------------------------------------------------------------------------------------------- -#}
+
+{%- macro generate_bulk_helpers() %}
+
+
+def _bulk_rows(rows, columns, names):
+    """
+    Returns rows of feature values for `create_many`, built from columns if given.
+
+    Columns map feature names to sequences of values, features without column are not set.
+    """
+    if not columns:
+        return rows
+    unknown = set(columns).difference(names)
+    if unknown:
+        raise TypeError('unexpected columns: {}'.format(', '.join(sorted(unknown))))
+    return zip(*(columns.get(name, repeat(None)) for name in names))
+
+
+def _ignore_notification(notification):
+    """Replaces `notify` of instances created by `create_many` without notifications."""
+{% endmacro %}
+
+{#- -------------------------------------------------------------------------------------------- -#}
+
+{%- macro generate_bulk_factory(c) %}
+{%- set features = c | bulkfeatures %}
+{%- set names = features | map('pyname') | list %}
+
+    @classmethod
+    def create_many(cls, rows=(), *, notify=True, **columns):
+        """Creates an instance per row of feature values, given as tuples or as named columns."""
+        if cls.eClass.abstract:
+            raise TypeError("Can't instantiate abstract EClass {}".format(cls.eClass.name))
+        _silent = None if notify else _ignore_notification
+        _instances = []
+        # rows are not unpacked, as feature names may shadow the arguments:
+        for _row in _bulk_rows(rows, columns, (
+            {{- names | map('pyquotesingle') | join(', ') }}{% if names | length == 1 %},{% endif %})):
+            _instance = cls.__new__(cls)
+            if _silent:
+                _instance.__dict__['notify'] = _silent
+    {%- if user_module or c | initfeatures is none %}
+            _instance.__init__(
+            {%- for name in names %}{{ name }}=_row[{{ loop.index0 }}]{% if not loop.last %}, {% endif %}{% endfor %})
+    {%- else %}
+        {%- for feature in features %}
+    {{ generate_feature_init(feature, '_instance', '_row[{}]'.format(loop.index0)) | indent(4) }}
+        {%- endfor %}
+    {%- endif %}
+            if _silent:
+                del _instance.__dict__['notify']
+            _instances.append(_instance)
+        return _instances
 {%- endmacro %}
 
 {#- -------------------------------------------------------------------------------------------- -#}
@@ -114,16 +240,16 @@ class Derived{{ d.name | capitalize }}(EDerivedCollection):
 
 {%- macro generate_operation_args(o) -%}
     {% for p in o.eParameters -%}
-        , {{ p.name }}{% if not p.required %}=None{% endif -%}
+        , {{ p | pyname }}{% if not p.required %}=None{% endif -%}
     {% endfor -%}
 {%- endmacro  %}
 
 {#- -------------------------------------------------------------------------------------------- -#}
 
 {%- macro generate_operation(o) %}
-    def {{ o.name }}(self{{ generate_operation_args(o) }}):
+    def {{ o | pyname }}(self{{ generate_operation_args(o) }}):
         {{ o | docstringline }}
-        raise NotImplementedError('operation {{ o.name }}(...) not yet implemented')
+        raise NotImplementedError('operation {{ o | pyname }}(...) not yet implemented')
 {%- endmacro %}
 
 {#- -------------------------------------------------------------------------------------------- -#}
@@ -143,10 +269,15 @@ class Derived{{ d.name | capitalize }}(EDerivedCollection):
 {%- for r in c.eReferences %}
     {{ generate_reference(r) -}}
 {% endfor %}
+{%- if compact_classes %}{{ generate_compact_attributes(c) }}
+{% endif %}
 {% if not user_module %}{% for d in c.eStructuralFeatures | selectattr('derived') | rejectattr('many') %}
     {{ generate_derived_single(d) }}
 {% endfor %}{% endif %}
 {{- generate_class_init(c) }}
+{%- if bulk_factories %}
+{{ generate_bulk_factory(c) }}
+{%- endif %}
 {% if not user_module %}{% for o in c.eOperations %}
     {{ generate_operation(o) }}
 {% endfor %}{% endif %}
@@ -1,73 +1,108 @@
 {% if auto_register_package -%}
     from pyecore.resources import global_registry
 {%- endif %}
-from .{{ element.name }} import getEClassifier, eClassifiers
-from .{{ element.name }} import name, nsURI, nsPrefix, eClass
+{%- if lazy_imports %}
+import importlib
+{%- endif %}
+from .{{ element | pyname }} import getEClassifier, eClassifiers
+from .{{ element | pyname }} import name, nsURI, nsPrefix, eClass
 {% if element.eClassifiers -%}
-    from .{{ element.name }} import {{ element.eClassifiers | join(', ', attribute='name') }}
+    from .{{ element | pyname }} import {{ element.eClassifiers | map('pyname') | join(', ') }}
 {%- endif %}
 
 {% for package, classifs in imported_classifiers_package.items() -%}
-    from {{ package|pyfqn }} import {{ classifs|map(attribute='name')|join(', ') }}
+    from {{ package|pyfqn }} import {{ classifs|map('pyname')|join(', ') }}
 {% endfor -%}
-{%- if not element.eSuperPackage %}
+{%- if not element.eSuperPackage and not lazy_imports %}
     {%- with %}
         {%- set all_references = element | all_contents(ecore.EReference) | list %}
         {%- set containing_types = all_references | map(attribute='eContainingClass') | list %}
         {%- set referenced_types = all_references | map(attribute='eType') | list %}
         {%- set types = containing_types + referenced_types | list %}
         {%- for sub in element | all_contents(ecore.EPackage) -%}
-            {% set types_in_sub = types | selectattr('ePackage', 'sameas', sub) | set %}
+            {% set types_in_sub = types | selectattr('ePackage', 'sameas', sub) | unique | sort(attribute='name') | list %}
             {%- if types_in_sub %}
-from {{ sub | pyfqn(relative_to=1) }} import {{ types_in_sub | map(attribute='name') | join(', ') }}
+from {{ sub | pyfqn(relative_to=1) }} import {{ types_in_sub | map('pyname') | join(', ') }}
             {%- endif -%}
         {% endfor -%}
     {% endwith -%}
 {% endif %}
-from . import {{ element.name }}
+from . import {{ element | pyname }}
 
 {%- if element.eSuperPackage %}
-from .. import {{ element.eSuperPackage.name }}
+from .. import {{ element.eSuperPackage | pyname }}
 {% endif %}
 
-{%- for sub in element.eSubpackages %}
-from . import {{ sub.name }}
-{% endfor %}
+{%- if not lazy_imports %}
+    {%- for sub in element.eSubpackages %}
+from . import {{ sub | pyname }}
+    {% endfor %}
+{%- endif %}
 
-__all__ = [{{ element.eClassifiers | map(attribute='name') | map('pyquotesingle') | join(', ') }}]
+__all__ = [{{ element.eClassifiers | map('pyname') | map('pyquotesingle') | join(', ') }}]
 
-eSubpackages = [{{ element.eSubpackages | map(attribute='name') | join(', ') }}]
-eSuperPackage = {{ element.eSuperPackage.name | default('None') }}
-{{ element.name }}.eSubpackages = eSubpackages
-{{ element.name }}.eSuperPackage = eSuperPackage
-{% if not element.eSuperPackage %}
+{% if lazy_imports -%}
+# subpackages are loaded on first access, see `__getattr__`:
+_subpackages = [{{ element.eSubpackages | map('pyname') | map('pyquotesingle') | join(', ') }}]
+{%- else -%}
+eSubpackages = [{{ element.eSubpackages | map('pyname') | join(', ') }}]
+{%- endif %}
+eSuperPackage = {{ element.eSuperPackage | pyname | default('None', true) }}
+{%- if not lazy_imports %}
+{{ element | pyname }}.eSubpackages = eSubpackages
+{%- endif %}
+{{ element | pyname }}.eSuperPackage = eSuperPackage
+{% if not element.eSuperPackage and not lazy_imports %}
     {%- for e in element | all_contents(ecore.EReference) | rejectattr('eOpposite') %}
-{{ e.eContainingClass.name }}.{{ e | derivedname }}.eType = {{ e.eType.name }}
+{{ e.eContainingClass | pyname }}.{{ e | derivedname }}.eType = {{ e.eType | pyname }}
+    {%- endfor %}
+    {%- for e, opposite_before_self in opposites %}
+{{ e.eContainingClass | pyname }}.{{ e | derivedname }}.eType = {{ e.eType | pyname }}
+        {%- if opposite_before_self %}
+{{ e.eContainingClass | pyname }}.{{ e | derivedname }}.eOpposite = {{ e.eOpposite.eContainingClass | pyname }}.{{ e.eOpposite | derivedname }}
+        {%- endif %}
     {%- endfor %}
-    {%- with opposites = element | all_contents(ecore.EReference) | selectattr('eOpposite') | list %}
-        {%- for e in opposites %}
-{{ e.eContainingClass.name }}.{{ e | derivedname }}.eType = {{ e.eType.name }}
-            {%- if e is opposite_before_self(opposites) %}
-{{ e.eContainingClass.name }}.{{ e | derivedname }}.eOpposite = {{ e.eOpposite.eContainingClass.name }}.{{ e.eOpposite | derivedname }}
-            {%- endif %}
-        {%- endfor %}
-    {%- endwith %}
 {%- endif %}
 
-otherClassifiers = [{{ element.eClassifiers | select('kind', ecore.EDataType) | map(attribute='name') | join(', ') }}]
-
-for classif in otherClassifiers:
-    eClassifiers[classif.name] = classif
-    classif.ePackage = eClass
+{% with datatypes = element.eClassifiers | select('kind', ecore.EDataType) | map('pyname') | list -%}
+otherClassifiers = [{{ datatypes | join(', ') }}]
+{%- if datatypes %}
+eClassifiers.update({ {%- for d in datatypes %}{{ d | pyquotesingle }}: {{ d }}{{ ', ' if not loop.last }}{% endfor -%} })
+{%- endif %}
+{%- endwith %}
+{%- if element.eClassifiers %}
 
-for classif in eClassifiers.values():
-    eClass.eClassifiers.append(classif.eClass)
+# classes registered themselves with the module when defined, adding all classifiers in a single
+# operation makes the package contain them:
+eClass.eClassifiers.extend([
+    {%- for c in element.eClassifiers %}{{ c | pyname }}{{ '.eClass' if c is type(ecore.EClass) }}{{ ', ' if not loop.last }}{% endfor -%}
+])
+{%- endif %}
+{% if lazy_imports %}
+{%- if element.eSuperPackage %}
+# the super package was loaded first and did not load this subpackage:
+eSuperPackage.eClass.eSubpackages.append(eClass)
+{% endif %}
+{%- if auto_register_package %}
+global_registry[nsURI] = {{ element | pyname }}
+{% endif %}
 
+def __getattr__(name):
+    """Loads subpackages on first access."""
+    if name in _subpackages:
+        return importlib.import_module('.' + name, __name__)
+    if name == 'eSubpackages':
+        subpackages = [importlib.import_module('.' + n, __name__) for n in _subpackages]
+        globals()['eSubpackages'] = {{ element | pyname }}.eSubpackages = subpackages
+        return subpackages
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+{%- else %}
 for subpack in eSubpackages:
     eClass.eSubpackages.append(subpack.eClass)
 {% if auto_register_package %}
-register_packages = [{{ element.name }}] + eSubpackages
+register_packages = [{{ element | pyname }}] + eSubpackages
 for pack in register_packages:
     global_registry[pack.nsURI] = pack
 
 {% endif %}
+{%- endif %}
@@ -0,0 +1,116 @@
+"""Regeneration of code whenever the files of the input metamodels change."""
+import logging
+import os
+import time
+
+import pyecore.resources
+from pyecoregen.dependencies import ResourceGraph, resource_name
+from pyecoregen.manifest import MANIFEST_FILENAME
+
+_logger = logging.getLogger(__name__)
+
+
+class Watcher:
+    """
+    Regenerates code whenever the files of one or more metamodels change.
+
+    The files of the metamodels and, with the generator's `with_dependencies`, of the metamodels
+    they depend on are polled for changes. The generator, including its compiled templates, and
+    the resource set are kept between generations: changed files are reloaded together with the
+    files depending on them, all other files stay loaded. The generator is switched to incremental
+    mode, so only packages that changed are regenerated, which writes the generator's manifest
+    file to the output folder. The generator's profile is cleared before each generation, so it
+    does not grow while watching and holds the records of the last generation.
+
+    Attributes:
+        generator: Generator regenerating the code.
+        paths: Paths of the `.ecore` files of the metamodels, generated as by
+            `EcoreGenerator.generate_many`.
+        outfolder: Folder the code is generated to.
+        interval: Seconds between two polls of the files.
+        resource_set: Resource set all files are loaded into, a new one if not given.
+    """
+
+    def __init__(self, generator, paths, outfolder, *, interval=1.0, resource_set=None):
+        self.generator = generator
+        if not generator.incremental:
+            _logger.info('Watch mode generates incrementally, keeping a manifest in {!r}.'.format(
+                os.path.join(outfolder, MANIFEST_FILENAME)))
+            generator.incremental = True
+        self.paths = paths
+        self.outfolder = outfolder
+        self.interval = interval
+        self.resource_set = resource_set or pyecore.resources.ResourceSet()
+        self._graph = None
+        self._mtimes = {}
+
+    @staticmethod
+    def _mtime(resource):
+        try:
+            return os.stat(resource.uri.plain).st_mtime_ns
+        except OSError:
+            # e.g. removed while the file is replaced by an editor:
+            return None
+
+    def load(self):
+        """Loads the metamodels, reusing all files still loaded, and returns their root packages."""
+        with self.generator.profile.measure('load'):
+            resources = [self.resource_set.get_resource(pyecore.resources.URI(p))
+                         for p in self.paths]
+            self._graph = ResourceGraph(*resources)
+        self._mtimes = {r: self._mtime(r) for r in self._graph.dependencies}
+        return [r.contents[0] for r in resources]
+
+    def changed_resources(self):
+        """Returns set of loaded resources whose file changed since they were loaded."""
+        return {r for r, mtime in self._mtimes.items() if self._mtime(r) not in (mtime, None)}
+
+    def affected_resources(self, changed):
+        """Returns set of changed resources and all resources directly or indirectly using them."""
+        affected = set(changed)
+        pending = list(changed)
+        while pending:
+            resource = pending.pop()
+            for dependent, dependencies in self._graph.dependencies.items():
+                if resource in dependencies and dependent not in affected:
+                    affected.add(dependent)
+                    pending.append(dependent)
+        return affected
+
+    def generate(self):
+        """Loads the metamodels and generates their code."""
+        self.generator.profile.clear()
+        self.generator.generate_many(self.load(), self.outfolder)
+
+    def poll(self):
+        """
+        Regenerates the code if a file changed since the last generation.
+
+        Returns:
+            Whether the code was regenerated.
+        """
+        changed = self.changed_resources()
+        if not changed:
+            return False
+
+        _logger.info('Changed: {}.'.format(', '.join(sorted(resource_name(r) for r in changed))))
+        for resource in self.affected_resources(changed):
+            self.resource_set.remove_resource(resource)
+        try:
+            self.generate()
+        except Exception:
+            # e.g. a file saved in an invalid state, the next change is tried again:
+            _logger.exception('Regeneration failed.')
+            for resource in changed:
+                self._mtimes[resource] = self._mtime(resource)
+        return True
+
+    def run(self, polls=None):
+        """Generates the code and regenerates it on each change, until interrupted."""
+        self.generate()
+        _logger.info('Watching {} file(s) for changes.'.format(len(self._mtimes)))
+        while polls is None or polls > 0:
+            time.sleep(self.interval)
+            self.poll()
+            if polls is not None:
+                polls -= 1
@@ -0,0 +1,126 @@
+"""Writing of generated files to the output folder or to memory."""
+import contextlib
+import filecmp
+import logging
+import os
+
+_logger = logging.getLogger(__name__)
+
+
+def split_lines(chunks):
+    """Yields the lines of text given in chunks of arbitrary size, without line endings."""
+    rest = ''
+    for chunk in chunks:
+        lines = (rest + chunk).split('\n')
+        rest = lines.pop()
+        yield from lines
+    if rest:
+        yield rest
+
+
+def write_atomic(filepath, chunks):
+    """
+    Writes text given in chunks to file, replacing it atomically if its content changed.
+
+    The chunks are written to a temporary file in the folder of the file, which replaces the file
+    once complete. Readers hence never see a partially written file, and the text is never held in
+    memory as a whole. If the file already has the written content, it is left untouched.
+
+    Returns:
+        Whether the file was written.
+    """
+    temppath = '{}.{}.tmp'.format(filepath, os.getpid())
+    try:
+        with open(temppath, 'wt') as file:
+            for chunk in chunks:
+                file.write(chunk)
+        if os.path.isfile(filepath) and filecmp.cmp(temppath, filepath, shallow=False):
+            os.remove(temppath)
+            return False
+        os.replace(temppath, filepath)
+        return True
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temppath)
+        raise
+
+
+def write_if_changed(filepath, code):
+    """
+    Writes code to file atomically, unless the file already has this content.
+
+    Returns:
+        Whether the file was written.
+    """
+    try:
+        with open(filepath, 'rt') as file:
+            if file.read() == code:
+                return False
+    except (OSError, UnicodeDecodeError):
+        pass
+    return write_atomic(filepath, [code])
+
+
+class Writer:
+    """
+    Writer of the generated files, counting written and unchanged files.
+
+    Files are only written if their content changed, so their modification time is kept otherwise
+    and caches depending on it, like Python's bytecode cache, stay valid.
+
+    Attributes:
+        written: Paths of the written files.
+        unchanged: Paths of the files that already had the generated content.
+    """
+
+    def __init__(self):
+        self.written = []
+        self.unchanged = []
+
+    def _record(self, filepath, written):
+        (self.written if written else self.unchanged).append(filepath)
+
+    @staticmethod
+    def _ensure_folder(filepath):
+        folder = os.path.dirname(filepath)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+    def write(self, filepath, code):
+        """Writes code to file, if changed."""
+        self._ensure_folder(filepath)
+        self._record(filepath, write_if_changed(filepath, code))
+
+    def stream(self, filepath, chunks):
+        """Writes code given in chunks to file, if changed."""
+        self._ensure_folder(filepath)
+        self._record(filepath, write_atomic(filepath, chunks))
+
+    def log(self):
+        _logger.info('Wrote {} file(s), {} file(s) unchanged.'.format(
+            len(self.written), len(self.unchanged)))
+
+
+class MemoryWriter(Writer):
+    """
+    Writer keeping the generated files in memory instead of writing them to disk.
+
+    Attributes:
+        files: Code of the generated files by path.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.files = {}
+
+    def write(self, filepath, code):
+        """Stores code of file."""
+        self.files[filepath] = code
+        self._record(filepath, True)
+
+    def stream(self, filepath, chunks):
+        """Stores code of file given in chunks."""
+        self.write(filepath, ''.join(chunks))
+
+    def log(self):
+        _logger.info('Generated {} file(s) in memory.'.format(len(self.written)))
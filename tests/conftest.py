@@ -6,6 +6,18 @@ import sys
 import pytest
 
 
+@pytest.fixture(scope='session', autouse=True)
+def cache_dir(tmp_path_factory):
+    """Keep the on-disk caches of all tests in a temporary folder, not in the user's cache."""
+    previous = os.environ.get('PYECOREGEN_CACHE_DIR')
+    os.environ['PYECOREGEN_CACHE_DIR'] = str(tmp_path_factory.mktemp('cache'))
+    yield
+    if previous is None:
+        del os.environ['PYECOREGEN_CACHE_DIR']
+    else:
+        os.environ['PYECOREGEN_CACHE_DIR'] = previous
+
+
 @pytest.fixture(scope='module')
 def cwd_module_dir():
     """Change current directory to this module's folder to access inputs and write outputs."""
@@ -1,8 +1,14 @@
 from pyecore import ecore
-from pyecoregen.adapter import pythonic_names
+from pyecoregen.adapter import fix_name_clash, pythonic_name
 
 
-def test__pythonic_names():
+def test__fix_name_clash():
+    assert fix_name_clash('att') == 'att'
+    assert fix_name_clash('pass') == 'pass_'
+    assert fix_name_clash('None') == 'None_'
+
+
+def test__pythonic_name():
     p = ecore.EPackage('MyPackage')
 
     c1 = ecore.EClass('MyClass')
@@ -15,16 +21,12 @@ def test__pythonic_names():
     a2 = ecore.EAttribute('else', ecore.EString, upper=-1)
     c2.eStructuralFeatures.append(a2)
 
-    assert c2.name == 'pass'
-    assert a2.name == 'else'
-
-    with pythonic_names():
-        assert c1.name == 'MyClass'
-        assert a1.name == 'att'
-        assert c2.name == 'pass_'
-        assert a2.name == 'else_'
+    assert pythonic_name(c1) == 'MyClass'
+    assert pythonic_name(a1) == 'att'
+    assert pythonic_name(c2) == 'pass_'
+    assert pythonic_name(a2) == 'else_'
+    assert pythonic_name(None) is None
 
+    # model itself is not modified:
     assert c2.name == 'pass'
     assert a2.name == 'else'
-
-
@@ -0,0 +1,105 @@
+import importlib.util
+import os
+import py_compile
+from unittest import mock
+
+import pytest
+
+from pyecore.resources import ResourceSet, URI
+from pyecoregen.bytecode import compile_all, compile_file, get_invalidation_mode, \
+    invalidation_modes_supported
+from pyecoregen.cli import generate_from_cli
+from pyecoregen.ecore import EcoreGenerator
+
+requires_invalidation_modes = pytest.mark.skipif(not invalidation_modes_supported(),
+                                                 reason='requires Python 3.7')
+
+
+def pyc_flags(path, optimize=''):
+    """Returns flags of the bytecode file of Python file, telling its invalidation mode."""
+    with open(importlib.util.cache_from_source(path, optimization=optimize), 'rb') as file:
+        return int.from_bytes(file.read(8)[4:], 'little')
+
+
+@requires_invalidation_modes
+def test__get_invalidation_mode():
+    assert get_invalidation_mode(None) is None
+    assert get_invalidation_mode('checked-hash') is py_compile.PycInvalidationMode.CHECKED_HASH
+    with pytest.raises(ValueError):
+        get_invalidation_mode('hash')
+
+
+@requires_invalidation_modes
+@pytest.mark.parametrize('jobs', [1, 2])
+def test__compile_all(jobs, tmpdir):
+    paths = []
+    for i in range(3):
+        path = str(tmpdir.join('module{}.py'.format(i)))
+        with open(path, 'w') as file:
+            file.write('x = {}\n'.format(i))
+        paths.append(path)
+    broken = str(tmpdir.join('broken.py'))
+    with open(broken, 'w') as file:
+        file.write('x = (\n')
+    skeleton = str(tmpdir.join('module.py.skeleton'))
+    with open(skeleton, 'w') as file:
+        file.write('x = 1\n')
+
+    failed = compile_all(paths + [broken, skeleton], jobs, optimize=2,
+                         invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+
+    assert failed == [broken]
+    assert all(pyc_flags(p, 2) == 1 for p in paths)
+    cached = [importlib.util.cache_from_source(p, optimization=2) for p in paths]
+    assert sorted(os.listdir(str(tmpdir.join('__pycache__')))) == sorted(
+        os.path.basename(c) for c in cached)
+
+
+@requires_invalidation_modes
+def test_generation_byte_compiles_modules(cwd_module_dir, tmpdir):
+    model = ResourceSet().get_resource(URI('input/library.ecore')).contents[0]
+    generator = EcoreGenerator(formatter='fast', byte_compile=True,
+                               invalidation_mode='checked-hash')
+    generator.generate(model, str(tmpdir))
+
+    assert len(generator.writer.written) == 2
+    for path in generator.writer.written:
+        # checked hash-based bytecode file:
+        assert pyc_flags(path) == 3
+    assert 'compile' in {r.phase for r in generator.profile.records}
+
+
+def test__compile_file__default_invalidation_mode(tmpdir):
+    path = str(tmpdir.join('module.py'))
+    with open(path, 'w') as file:
+        file.write('x = 1\n')
+
+    # Python 3.6 does not know the keyword, so it is only passed if a mode is chosen:
+    with mock.patch('compileall.compile_file', return_value=True) as compile_:
+        assert compile_file(path)
+    assert 'invalidation_mode' not in compile_.call_args[1]
+
+    assert compile_file(path)
+    assert os.path.exists(importlib.util.cache_from_source(path))
+
+
+def test_invalidation_mode_unsupported(cwd_module_dir, monkeypatch):
+    monkeypatch.delattr(py_compile, 'PycInvalidationMode', raising=False)
+    with pytest.raises(ValueError):
+        EcoreGenerator(invalidation_mode='checked-hash')
+    with pytest.raises(SystemExit):
+        generate_from_cli(['-e', 'input/library.ecore', '-o', 'some/folder', '--byte-compile',
+                           '--invalidation-mode', 'checked-hash'])
+
+
+def test_generation_to_memory_skips_byte_compilation(cwd_module_dir, tmpdir, monkeypatch):
+    model = ResourceSet().get_resource(URI('input/library.ecore')).contents[0]
+    generator = EcoreGenerator(formatter='fast', byte_compile=True)
+    monkeypatch.chdir(str(tmpdir))
+    generator.generate_sources(model)
+    assert not os.listdir(str(tmpdir))
+
+
+def test_unknown_invalidation_mode():
+    with pytest.raises(ValueError):
+        EcoreGenerator(invalidation_mode='hash')
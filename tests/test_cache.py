@@ -0,0 +1,142 @@
+import os
+import shutil
+from unittest import mock
+
+import jinja2
+import pyecore
+import pytest
+from pyecore.resources import URI
+from pyecore.resources.resource import HttpURI
+from pyecore.resources.xmi import XMIResource
+
+from pyecoregen import cache
+from pyecoregen.cache import ModelCache, TemplateCache, default_cache_dir
+from pyecoregen.ecore import EcoreGenerator
+
+
+def test__default_cache_dir(monkeypatch):
+    monkeypatch.delenv('PYECOREGEN_CACHE_DIR', raising=False)
+    monkeypatch.setenv('XDG_CACHE_HOME', '/xdg')
+    assert default_cache_dir() == os.path.join('/xdg', 'pyecoregen')
+    monkeypatch.setenv('PYECOREGEN_CACHE_DIR', '/custom')
+    assert default_cache_dir() == '/custom'
+
+
+def test__template_cache__versioned_folder(tmpdir):
+    cache = TemplateCache(str(tmpdir))
+    assert cache.directory == os.path.join(str(tmpdir), 'jinja-{}'.format(jinja2.__version__))
+
+
+def test__template_cache__reused(tmpdir, monkeypatch):
+    directory = str(tmpdir)
+    first = EcoreGenerator(template_cache=directory).tasks[0].environment
+    first.get_template('module.py.tpl')
+    assert os.listdir(first.bytecode_cache.directory)
+
+    # templates are loaded from the cache and not compiled again:
+    def dump_bytecode(self, bucket):
+        raise AssertionError('template {!r} compiled again'.format(bucket.key))
+    monkeypatch.setattr(TemplateCache, 'dump_bytecode', dump_bytecode)
+    second = EcoreGenerator(template_cache=directory).tasks[0].environment
+    second.get_template('module.py.tpl')
+
+
+def test__template_cache__errors_ignored(tmpdir):
+    # cache folder cannot be created below a file:
+    blocker = tmpdir.join('file')
+    blocker.write('')
+    environment = EcoreGenerator(template_cache=str(blocker)).tasks[0].environment
+    assert environment.get_template('package.py.tpl')
+
+
+def test__template_cache__disabled():
+    environment = EcoreGenerator(template_cache=False).tasks[0].environment
+    assert environment.bytecode_cache is None
+
+    # library users opt in to the cache:
+    assert EcoreGenerator().tasks[0].environment.bytecode_cache is None
+
+
+def generate(model, folder):
+    """Generates code of model and returns the generated files with their content, by path."""
+    EcoreGenerator(formatter='fast').generate(model, folder)
+    files = {}
+    for root, _, names in os.walk(folder):
+        for name in names:
+            with open(os.path.join(root, name)) as file:
+                files[os.path.relpath(os.path.join(root, name), folder)] = file.read()
+    return files
+
+
+@pytest.fixture
+def model_cache(tmpdir):
+    return ModelCache(str(tmpdir.join('cache')))
+
+
+def load(cache, path):
+    return cache.resource_set().get_resource(URI(path))
+
+
+def test__model_cache__versioned_folder(model_cache, tmpdir):
+    folder = 'models-{}-pyecore-{}'.format(ModelCache.version, pyecore.__version__)
+    assert model_cache.directory == os.path.join(str(tmpdir), 'cache', folder)
+
+
+@pytest.mark.parametrize('name', ['library.ecore', 'A.ecore', 'E.ecore'])
+def test__model_cache__restored_model_generates_same_code(name, model_cache, cwd_module_dir,
+                                                          tmpdir, monkeypatch):
+    path = os.path.join('input', name)
+    parsed = load(model_cache, path)
+    # generation loads the dependencies, which are cached as well:
+    expected = generate(parsed.contents[0], str(tmpdir.join('parsed')))
+    assert os.listdir(model_cache.directory)
+
+    # second load is restored from the cache without parsing:
+    def parse(self, options=None):
+        raise AssertionError('{} parsed again'.format(self.uri.plain))
+    monkeypatch.setattr(XMIResource, 'load', parse)
+    restored = load(model_cache, path)
+
+    assert restored.prefixes == parsed.prefixes
+    assert generate(restored.contents[0], str(tmpdir.join('restored'))) == expected
+
+
+def test__model_cache__changed_file_parsed(model_cache, cwd_module_dir, tmpdir):
+    path = str(tmpdir.join('library.ecore'))
+    shutil.copy(os.path.join('input', 'library.ecore'), path)
+    load(model_cache, path)
+
+    with open(path) as file:
+        content = file.read()
+    with open(path, 'w') as file:
+        file.write(content.replace('name="Book"', 'name="Novel"'))
+
+    package = load(model_cache, path).contents[0]
+    assert package.getEClassifier('Novel') and not package.getEClassifier('Book')
+
+
+def test__model_cache__uncacheable_parsed(model_cache, cwd_module_dir, monkeypatch):
+    monkeypatch.setattr(cache, '_snapshot', lambda resource: None)
+    assert load(model_cache, os.path.join('input', 'library.ecore')).contents
+    assert not os.path.exists(model_cache.directory)
+
+
+def test__model_cache__errors_ignored(model_cache, cwd_module_dir):
+    path = os.path.join('input', 'library.ecore')
+    load(model_cache, path)
+    for name in os.listdir(model_cache.directory):
+        with open(os.path.join(model_cache.directory, name), 'wb') as file:
+            file.write(b'corrupt')
+    assert load(model_cache, path).contents[0].name == 'library'
+
+
+def test__model_cache__remote_stamp():
+    uri = HttpURI('http://host/model.ecore')
+    response = mock.MagicMock()
+    response.__enter__.return_value.headers = {'ETag': '"abc"'}
+    with mock.patch('urllib.request.urlopen', return_value=response) as urlopen:
+        assert ModelCache.stamp(uri) == '"abc"'
+    assert urlopen.call_args[0][0].get_method() == 'HEAD'
+
+    with mock.patch('urllib.request.urlopen', side_effect=OSError):
+        assert ModelCache.stamp(uri) is None
@@ -1,27 +1,59 @@
+import json
+import os
+import pstats
 from unittest import mock
 
 import pyecore
 import pytest
-from pyecoregen.cli import generate_from_cli, select_uri_implementation
+from pyecoregen.cache import CachedXMIResource
+from pyecoregen.cli import generate_from_cli, read_model_list, select_uri_implementation
 
 
 @mock.patch('pyecoregen.cli.EcoreGenerator')
 def test__generate_from_cli(generator_mock, cwd_module_dir):
     mock_generator = generator_mock()
-    mock_generator.generate = mock.MagicMock()
+    mock_generator.generate_many = mock.MagicMock()
 
     generate_from_cli(['-e', 'input/library.ecore', '-o', 'some/folder'])
 
     # look at arguments of generate call:
-    mock_generate = generator_mock().generate
-    model = mock_generator.generate.call_args[0][0]
-    path = mock_generator.generate.call_args[0][1]
+    models = mock_generator.generate_many.call_args[0][0]
+    path = mock_generator.generate_many.call_args[0][1]
 
+    model, = models
     assert isinstance(model, pyecore.ecore.EPackage)
     assert model.name == 'library'
     assert path == 'some/folder'
 
 
+@mock.patch('pyecoregen.cli.EcoreGenerator')
+def test__generate_from_cli__many_models(generator_mock, cwd_module_dir, tmpdir):
+    model_list = tmpdir.join('models.txt')
+    model_list.write('# models of the build\n\n{}\n'.format(os.path.abspath('input/A.ecore')))
+    generate_from_cli(['-e', 'input/library.ecore', '-e', 'input/B.ecore',
+                       '--model-list', str(model_list), '-o', 'some/folder'])
+
+    models = generator_mock().generate_many.call_args[0][0]
+    assert [m.name for m in models] == ['library', 'b', 'a']
+    # models are loaded into a single resource set:
+    assert models[1].eResource.resource_set is models[2].eResource.resource_set
+
+
+def test__generate_from_cli__no_model():
+    with pytest.raises(SystemExit):
+        generate_from_cli(['-o', 'some/folder'])
+
+
+def test__read_model_list(tmpdir):
+    model_list = tmpdir.join('models.txt')
+    model_list.write('# comment\na.ecore\n  sub/b.ecore  \n\nhttp://host/c.ecore\n')
+    assert read_model_list(str(model_list)) == [
+        str(tmpdir.join('a.ecore')),
+        str(tmpdir.join('sub', 'b.ecore')),
+        'http://host/c.ecore',
+    ]
+
+
 @mock.patch('pyecoregen.cli.EcoreGenerator')
 def test__generate_from_cli__auto_register_package(generator_mock, cwd_module_dir):
     generate_from_cli(['-e', 'input/library.ecore', '-o', 'some/folder', '--auto-register-package'])
@@ -57,6 +89,146 @@ def test__generate_from_cli__with_dependencies(generator_mock, cwd_module_dir):
     assert with_dependencies is True  # make sure we don't interpret mock attribute as `True`
 
 
+@mock.patch('pyecoregen.cli.EcoreGenerator')
+def test__generate_from_cli__lazy_imports(generator_mock, cwd_module_dir):
+    generate_from_cli(['-e', 'input/library.ecore', '-o', 'some/folder', '--lazy-imports'])
+
+    # look at arguments of generator instantiation:
+    lazy_imports = generator_mock.call_args[1]['lazy_imports']
+    assert lazy_imports is True  # make sure we don't interpret mock attribute as `True`
+
+
+@mock.patch('pyecoregen.cli.EcoreGenerator')
+def test__generate_from_cli__compact_classes(generator_mock, cwd_module_dir):
+    generate_from_cli(['-e', 'input/library.ecore', '-o', 'some/folder', '--compact-classes'])
+
+    # look at arguments of generator instantiation:
+    compact_classes = generator_mock.call_args[1]['compact_classes']
+    assert compact_classes is True  # make sure we don't interpret mock attribute as `True`
+
+
+@mock.patch('pyecoregen.cli.EcoreGenerator')
+def test__generate_from_cli__flat_init(generator_mock, cwd_module_dir):
+    generate_from_cli(['-e', 'input/library.ecore', '-o', 'some/folder', '--flat-init'])
+
+    # look at arguments of generator instantiation:
+    flat_init = generator_mock.call_args[1]['flat_init']
+    assert flat_init is True  # make sure we don't interpret mock attribute as `True`
+
+
+@mock.patch('pyecoregen.cli.EcoreGenerator')
+def test__generate_from_cli__bulk_factories(generator_mock, cwd_module_dir):
+    generate_from_cli(['-e', 'input/library.ecore', '-o', 'some/folder', '--bulk-factories'])
+
+    # look at arguments of generator instantiation:
+    bulk_factories = generator_mock.call_args[1]['bulk_factories']
+    assert bulk_factories is True  # make sure we don't interpret mock attribute as `True`
+
+
+@mock.patch('pyecoregen.cli.EcoreGenerator')
+def test__generate_from_cli__stream(generator_mock, cwd_module_dir):
+    generate_from_cli(['-e', 'input/library.ecore', '-o', 'some/folder', '--formatter', 'fast',
+                       '--stream'])
+
+    # look at arguments of generator instantiation:
+    streaming = generator_mock.call_args[1]['streaming']
+    assert streaming is True  # make sure we don't interpret mock attribute as `True`
+
+
+@mock.patch('pyecoregen.cli.EcoreGenerator')
+def test__generate_from_cli__byte_compile(generator_mock, cwd_module_dir):
+    generate_from_cli(['-e', 'input/library.ecore', '-o', 'some/folder', '--byte-compile',
+                       '--compile-optimize', '2', '--invalidation-mode', 'checked-hash'])
+
+    # look at arguments of generator instantiation:
+    kwargs = generator_mock.call_args[1]
+    assert kwargs['byte_compile'] is True
+    assert kwargs['compile_optimize'] == 2
+    assert kwargs['invalidation_mode'] == 'checked-hash'
+
+
+@mock.patch('pyecoregen.cli.Watcher')
+@mock.patch('pyecoregen.cli.EcoreGenerator')
+def test__generate_from_cli__watch(generator_mock, watcher_mock, cwd_module_dir):
+    watcher_mock.return_value.run.side_effect = KeyboardInterrupt
+    generate_from_cli(['-e', 'input/library.ecore', '-o', 'some/folder', '--watch',
+                       '--watch-interval', '0.5'])
+
+    watcher_mock.assert_called_once_with(generator_mock.return_value, ['input/library.ecore'],
+                                         'some/folder', interval=0.5,
+                                         resource_set=mock.ANY)
+    assert watcher_mock.return_value.run.called
+    assert not generator_mock.return_value.generate_many.called
+
+
+def test__generate_from_cli__watch_remote():
+    with pytest.raises(SystemExit):
+        generate_from_cli(['-e', 'http://some/model.ecore', '-o', 'some/folder', '--watch'])
+
+
+@mock.patch('pyecoregen.cli.EcoreGenerator')
+def test__generate_from_cli__incremental(generator_mock, cwd_module_dir):
+    generate_from_cli(['-e', 'input/library.ecore', '-o', 'some/folder', '--incremental'])
+
+    # look at arguments of generator instantiation:
+    incremental = generator_mock.call_args[1]['incremental']
+    assert incremental is True  # make sure we don't interpret mock attribute as `True`
+
+
+@mock.patch('pyecoregen.cli.EcoreGenerator')
+def test__generate_from_cli__jobs(generator_mock, cwd_module_dir):
+    generate_from_cli(['-e', 'input/library.ecore', '-o', 'some/folder', '--jobs', '4'])
+
+    # look at arguments of generator instantiation:
+    jobs = generator_mock.call_args[1]['jobs']
+    assert jobs == 4
+
+
+@mock.patch('pyecoregen.cli.EcoreGenerator')
+def test__generate_from_cli__formatter(generator_mock, cwd_module_dir):
+    generate_from_cli(['-e', 'input/library.ecore', '-o', 'some/folder', '--formatter', 'fast'])
+
+    # look at arguments of generator instantiation:
+    formatter = generator_mock.call_args[1]['formatter']
+    assert formatter == 'fast'
+
+
+@mock.patch('pyecoregen.cli.EcoreGenerator')
+def test__generate_from_cli__no_template_cache(generator_mock, cwd_module_dir):
+    generate_from_cli(['-e', 'input/library.ecore', '-o', 'some/folder'])
+    assert generator_mock.call_args[1]['template_cache'] is True
+
+    generate_from_cli(['-e', 'input/library.ecore', '-o', 'some/folder', '--no-template-cache'])
+    assert generator_mock.call_args[1]['template_cache'] is False
+
+
+@mock.patch('pyecoregen.cli.EcoreGenerator')
+def test__generate_from_cli__model_cache(generator_mock, cwd_module_dir, tmpdir, monkeypatch):
+    monkeypatch.setenv('PYECOREGEN_CACHE_DIR', str(tmpdir))
+    generate_from_cli(['-e', 'input/library.ecore', '-o', 'some/folder'])
+    model, = generator_mock().generate_many.call_args[0][0]
+    assert not isinstance(model.eResource, CachedXMIResource)
+    assert not tmpdir.listdir()
+
+    generate_from_cli(['-e', 'input/library.ecore', '-o', 'some/folder', '--model-cache'])
+    model, = generator_mock().generate_many.call_args[0][0]
+    assert isinstance(model.eResource, CachedXMIResource)
+    assert tmpdir.listdir()
+
+
+def test__generate_from_cli__profile(cwd_module_dir, tmpdir):
+    profile = str(tmpdir.join('profile.json'))
+    cprofile = str(tmpdir.join('generation.prof'))
+    generate_from_cli(['-e', 'input/library.ecore', '-o', str(tmpdir.join('out')),
+                       '--profile', profile, '--cprofile', cprofile])
+
+    with open(profile) as file:
+        report = json.load(file)
+    assert {'load', 'index', 'context', 'render', 'format', 'write'} <= set(report['phases'])
+    assert set(report['packages']) == {'library'}
+    assert pstats.Stats(cprofile).total_calls > 0
+
+
 testdata = [
     ('/tmp/test.ecore', pyecore.resources.URI),
     ('C:\\test.ecore', pyecore.resources.URI),
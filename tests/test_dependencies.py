@@ -0,0 +1,60 @@
+import logging
+import os
+
+import pytest
+
+from pyecore.resources import ResourceSet, URI
+from pyecoregen.dependencies import ResourceGraph, resource_name
+from pyecoregen.ecore import EcoreGenerator
+
+
+@pytest.fixture
+def rset(cwd_module_dir):
+    return ResourceSet()
+
+
+def name(resource):
+    return os.path.basename(resource_name(resource))
+
+
+def test__resource_graph__dependencies(rset):
+    resource = rset.get_resource(URI('input/A.ecore'))
+    graph = ResourceGraph(resource)
+    assert {name(r): [name(d) for d in deps] for r, deps in graph.dependencies.items()} == {
+        'A.ecore': ['B.ecore'],
+        'B.ecore': ['C.ecore', 'D.ecore'],
+        'C.ecore': [],
+        'D.ecore': [],
+    }
+
+
+def test__resource_graph__unreferenced_resources_ignored(rset):
+    rset.get_resource(URI('input/E.ecore'))
+    resource = rset.get_resource(URI('input/A.ecore'))
+    graph = ResourceGraph(resource)
+    assert 'E.ecore' not in {name(r) for r in graph.dependencies}
+
+
+def test__resource_graph__topological_order(rset):
+    resource = rset.get_resource(URI('input/A.ecore'))
+    order = [name(r) for r in ResourceGraph(resource).topological_order()]
+    assert order == ['C.ecore', 'D.ecore', 'B.ecore', 'A.ecore']
+
+
+def test__resource_graph__report(rset, caplog):
+    resource = rset.get_resource(URI('input/A.ecore'))
+    with caplog.at_level(logging.INFO, logger='pyecoregen.dependencies'):
+        ResourceGraph(resource).report()
+    messages = [r.getMessage() for r in caplog.records]
+    assert len(messages) == 4
+    assert 'A.ecore' in messages[-1] and 'B.ecore' in messages[-1]
+    assert 'no other resource' in messages[0]
+
+
+def test__generate_with_dependencies_exclude(rset, tmpdir):
+    resource = rset.get_resource(URI('input/A.ecore'))
+    exclude = set()
+    EcoreGenerator(with_dependencies=True).generate(resource.contents[0], str(tmpdir),
+                                                    exclude=exclude)
+    assert {name(r) for r in exclude} == {'A.ecore', 'B.ecore', 'C.ecore', 'D.ecore'}
+    assert {p.basename for p in tmpdir.listdir()} == {'a', 'b', 'c', 'd'}
@@ -1,5 +1,6 @@
 import importlib
 from os import path
+from unittest import mock
 
 import pytest
 
@@ -34,3 +35,16 @@ def test_cross_resource_packages(generated_metamodel):
     assert A_package is not D_package
     assert B_package is not D_package
     assert C_package is not D_package
+
+
+def test_generate_many_shared_dependencies(cwd_module_dir, tmpdir):
+    rset = ResourceSet()
+    models = [rset.get_resource(URI(path.join('input', name))).contents[0]
+              for name in ('A.ecore', 'B.ecore', 'E.ecore')]
+    generator = EcoreGenerator(with_dependencies=True, formatter='fast')
+    with mock.patch.object(generator, 'generate', wraps=generator.generate) as generate:
+        generator.generate_many(models, str(tmpdir))
+
+    # B was generated as dependency of A:
+    assert [c[0][0].name for c in generate.call_args_list] == ['a', 'e']
+    assert tmpdir.join('b', 'b.py').check()
@@ -3,8 +3,10 @@ from unittest import mock
 
 import pytest
 
-from pyecore.ecore import EPackage, EClass, EEnum, EAttribute, EString, EInt
+from pyecore.ecore import EPackage, EClass, EEnum, EAttribute, EReference, EString, EInt, \
+    EModelElement
 from pyecoregen.ecore import EcoreTask, EcorePackageInitTask, EcorePackageModuleTask, EcoreGenerator
+from pyecoregen.index import ModelIndex
 
 
 def test__ecore_task__filtered_elements():
@@ -68,6 +70,24 @@ def test__ecore_generator__filter_pyfqn(package_in_hierarchy):
         assert EcoreGenerator.filter_pyfqn(package_in_hierarchy, relative_to=4) == '.'
 
 
+def test__ecore_generator__filter_pyfqn_index(package_in_hierarchy):
+    index = ModelIndex(package_in_hierarchy.eSuperPackage.eSuperPackage)
+    assert EcoreGenerator.filter_pyfqn(package_in_hierarchy, index=index) == 'pkg1.pkg2.pkg3'
+    assert EcoreGenerator.filter_pyfqn(package_in_hierarchy, 2, index=index) == '.pkg3'
+
+
+def test__ecore_generator__filter_pymodule(package_in_hierarchy):
+    assert EcoreGenerator.filter_pymodule(package_in_hierarchy) == 'pkg1.pkg2.pkg3.pkg3'
+    assert EcoreGenerator.filter_pymodule(EClass.eClass.ePackage) == 'pyecore.ecore'
+
+
+def test__ecore_generator__filter_all_contents_index(package_in_hierarchy):
+    root = package_in_hierarchy.eSuperPackage.eSuperPackage
+    index = ModelIndex(root)
+    assert list(EcoreGenerator.filter_all_contents(root, EPackage, index=index)) == \
+        list(EcoreGenerator.filter_all_contents(root, EPackage))
+
+
 def test__ecore_generator__test_opposite_before_self():
     mock_element = mock.MagicMock()
     mock_element.eOpposite = mock.sentinel.OPPOSITE
@@ -85,6 +105,106 @@ def test__ecore_generator__test_opposite_before_self():
     assert not EcoreGenerator.test_opposite_before_self(mock_element, elements)
 
 
+def test__ecore_package_init_task__opposites():
+    a, b, c, d = (mock.MagicMock() for _ in range(4))
+    a.eOpposite, b.eOpposite = b, a
+    c.eOpposite = None
+    d.eOpposite = mock.sentinel.OPPOSITE  # not part of the passed references
+
+    opposites = EcorePackageInitTask.opposites([a, c, b, d])
+    assert opposites == [(a, False), (b, True), (d, False)]
+
+
+def test__ecore_package_module_task__references():
+    package, other = EPackage('package'), EPackage('other')
+    a, b, c = EClass('A'), EClass('B'), EClass('C')
+    package.eClassifiers.extend([a, b])
+    other.eClassifiers.append(c)
+
+    to_b = EReference('to_b', b)
+    to_a = EReference('to_a', a, eOpposite=to_b)
+    to_c = EReference('to_c', c)
+    from_c = EReference('from_c', a, eOpposite=to_c)
+    a.eStructuralFeatures.append(to_b)
+    b.eStructuralFeatures.extend([to_a, to_c])
+    c.eStructuralFeatures.append(from_c)
+
+    references = EcorePackageModuleTask.references([a, b])
+    assert references == [(to_b, False), (to_a, True), (to_c, True)]
+    assert EcorePackageModuleTask.referenced_classifiers(package, references) == {other: [c]}
+
+
+def test__ecore_package_module_task__classes():
+    # diamond: D(B, C), B(A), C(A), with E deriving from a class of another package:
+    package, other = EPackage('package'), EPackage('other')
+    a, b, c, d, e, f = (EClass(n) for n in 'ABCDEF')
+    b.eSuperTypes.append(a)
+    c.eSuperTypes.append(a)
+    d.eSuperTypes.extend([b, c])
+    e.eSuperTypes.append(f)
+    package.eClassifiers.extend([d, c, e, b, EEnum('Kind'), a])
+    other.eClassifiers.append(f)
+
+    assert EcorePackageModuleTask.classes(package) == [e, a, c, b, d]
+
+
+def test__ecore_package_module_task__classes_cycle():
+    package = EPackage('package')
+    a, b, c, d = (EClass(n) for n in 'ABCD')
+    b.eSuperTypes.append(a)
+    c.eSuperTypes.append(b)
+    # pyecore fails to compute the supertypes of a cycle, but keeps it in the model:
+    with pytest.raises(RecursionError):
+        a.eSuperTypes.append(b)
+    package.eClassifiers.extend([a, b, c, d])
+
+    with pytest.raises(ValueError) as excinfo:
+        EcorePackageModuleTask.classes(package)
+    assert 'A, B, C' in str(excinfo.value)
+
+
+def test__ecore_task__group_by_package():
+    first, second = EPackage('first'), EPackage('second')
+    a, b, c, d = EClass('A'), EClass('B'), EClass('C'), EClass('D')
+    second.eClassifiers.extend([d, a])
+    first.eClassifiers.extend([c, b])
+
+    grouped = EcoreTask.group_by_package({a, b, c, d})
+    assert list(grouped.items()) == [(first, [b, c]), (second, [a, d])]
+
+
+def test__ecore_generator__filter_init_features():
+    # diamond: D(B, C), B(A), C(A)
+    a, b, c, d = EClass('A'), EClass('B'), EClass('C'), EClass('D')
+    b.eSuperTypes.append(a)
+    c.eSuperTypes.append(a)
+    d.eSuperTypes.extend([b, c])
+    package = EPackage('package')
+    package.eClassifiers.extend([a, b, c, d])
+    for eclass in (a, b, c, d):
+        name = eclass.name.lower()
+        eclass.eStructuralFeatures.append(EReference('ref_' + name, a))
+        eclass.eStructuralFeatures.append(EAttribute('attr_' + name, EString))
+
+    assert EcoreGenerator.linearization(d) == [d, b, c, a]
+    features = EcoreGenerator.filter_init_features(d)
+    assert [f.name for f in features] == ['attr_a', 'ref_a', 'attr_c', 'ref_c', 'attr_b', 'ref_b',
+                                          'attr_d', 'ref_d']
+
+
+def test__ecore_generator__filter_init_features_non_generated_base():
+    eclass = EClass('Element', superclass=(EModelElement.eClass,))
+    eclass.eStructuralFeatures.append(EAttribute('name', EString))
+    EPackage('package').eClassifiers.append(eclass)
+    assert EcoreGenerator.filter_init_features(eclass) is None
+    assert [f.name for f in EcoreGenerator.filter_bulk_features(eclass)] == ['name']
+
+
+def test__ecore_generator__flat_init_user_module():
+    with pytest.raises(ValueError):
+        EcoreGenerator(flat_init=True, user_module='user')
+
+
 def test__ecore_generator__manage_default_value_simple_types():
     attribute = EAttribute('with_default', EString)
     attribute.defaultValueLiteral = 'str_val'
@@ -111,3 +231,30 @@ def test__ecore_generator__manage_default_value_enumeration():
     attribute.defaultValueLiteral = 'None'
     result = EcoreGenerator.manage_default_value(attribute)
     assert result == 'MyEnum.None_'
+
+
+def test__ecore_generator__dispatch(package_in_hierarchy):
+    root = package_in_hierarchy.eContainer().eContainer()
+    generator = EcoreGenerator(user_module='user')
+    init_task, module_task, mixin_task = generator.tasks
+
+    # each package is passed to all tasks, one package after the other:
+    assert list(generator.dispatch(root)) == [
+        (task, package) for package in (root, root.eSubpackages[0], package_in_hierarchy)
+        for task in (init_task, module_task, mixin_task)
+    ]
+
+
+def test__ecore_generator__shared_template_context(tmpdir):
+    package = EPackage('shared')
+    package.eClassifiers.append(EClass('A'))
+    generator = EcoreGenerator(user_module='user', formatter='raw')
+
+    original = EcorePackageModuleTask.create_template_context
+    with mock.patch.object(EcorePackageModuleTask, 'create_template_context',
+                           autospec=True, side_effect=original) as create:
+        generator.generate(package, str(tmpdir))
+
+    # the module and mixin tasks share the context:
+    assert create.call_count == 1
+    assert all(task.contexts is None for task in generator.tasks)
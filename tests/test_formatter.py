@@ -0,0 +1,115 @@
+import os
+
+import pycodestyle
+import pytest
+
+import multigen.formatter
+from pyecore.resources import ResourceSet, URI
+from pyecoregen.ecore import EcoreGenerator
+from pyecoregen.formatter import format_fast, format_autopep8_parallel, get_formatter, \
+    get_line_formatter, normalize_lines
+
+
+def test__format_fast__blank_lines():
+    raw = '\n\nimport os\nx = 1\n\n\n\n\nclass A:\n    \n    a = 1\n\n\n    def f(self):\n' \
+          '        pass\n    def g(self):\n        pass\ny = 2\n\n\n\n'
+    assert format_fast(raw) == 'import os\nx = 1\n\n\nclass A:\n\n    a = 1\n\n    def f(self):\n' \
+                               '        pass\n\n    def g(self):\n        pass\n\n\ny = 2\n'
+
+
+def test__format_fast__decorator():
+    raw = 'x = 1\n@abstract\n\nclass A:\n    """Doc."""\n    def f(self):\n        pass\n'
+    assert format_fast(raw) == 'x = 1\n\n\n@abstract\nclass A:\n    """Doc."""\n' \
+                               '    def f(self):\n        pass\n'
+
+
+def test__format_fast__multiline_string():
+    raw = 'class A:\n    """First.  \n\n\n\n    Last."""  \n'
+    assert format_fast(raw) == 'class A:\n    """First.  \n\n\n\n    Last."""\n'
+
+
+def test__format_fast__empty():
+    assert format_fast('') == ''
+    assert format_fast('\n  \n') == ''
+
+
+def test__format_autopep8_parallel():
+    raws = ['x=1\n', 'def f( a ):\n  return a\n']
+    assert format_autopep8_parallel(raws) == [multigen.formatter.format_autopep8(r) for r in raws]
+
+
+def test__get_formatter():
+    assert get_formatter('fast') is format_fast
+    assert get_formatter(format_fast) is format_fast
+    with pytest.raises(ValueError):
+        get_formatter('unknown')
+
+
+def test__get_line_formatter():
+    assert get_line_formatter(format_fast) is normalize_lines
+    assert get_line_formatter(multigen.formatter.format_raw) is None
+    with pytest.raises(ValueError):
+        get_line_formatter(multigen.formatter.format_autopep8)
+    with pytest.raises(ValueError):
+        get_line_formatter(format_autopep8_parallel)
+
+
+def read_tree(folder):
+    files = {}
+    for dirpath, _, filenames in os.walk(folder):
+        for filename in filenames:
+            with open(os.path.join(dirpath, filename)) as file:
+                files[os.path.relpath(os.path.join(dirpath, filename), folder)] = file.read()
+    return files
+
+
+@pytest.fixture(params=[
+    ('library.ecore', None),
+    ('library.ecore', 'user_provided.module'),
+    ('A.ecore', None),
+])
+def generator_input(request, cwd_module_dir):
+    ecore_file, user_module = request.param
+    model = ResourceSet().get_resource(URI(os.path.join('input', ecore_file))).contents[0]
+    options = dict(user_module=user_module, auto_register_package=True, with_dependencies=True)
+    return model, options
+
+
+def test_fast_formatter_output_quality(generator_input, tmpdir):
+    model, options = generator_input
+    EcoreGenerator(formatter='fast', **options).generate(model, str(tmpdir))
+
+    files = read_tree(str(tmpdir))
+    for path, code in files.items():
+        if path.endswith('.py'):
+            compile(code, path, 'exec')
+
+    # like autopep8, the fast formatter does not wrap long lines:
+    style = pycodestyle.StyleGuide(max_line_length=100, ignore=['E501'], quiet=True)
+    assert style.check_files([str(tmpdir)]).total_errors == 0
+
+
+def test_parallel_formatter_output(generator_input, tmpdir):
+    model, options = generator_input
+    single = str(tmpdir.mkdir('single'))
+    parallel = str(tmpdir.mkdir('parallel'))
+    EcoreGenerator(**options).generate(model, single)
+    EcoreGenerator(formatter='parallel', jobs=2, **options).generate(model, parallel)
+
+    assert read_tree(parallel) == read_tree(single)
+
+
+@pytest.mark.parametrize('formatter', ['fast', 'raw'])
+def test_streamed_output(generator_input, formatter, tmpdir):
+    model, options = generator_input
+    rendered = str(tmpdir.mkdir('rendered'))
+    streamed = str(tmpdir.mkdir('streamed'))
+    EcoreGenerator(formatter=formatter, **options).generate(model, rendered)
+    EcoreGenerator(formatter=formatter, streaming=True, **options).generate(model, streamed)
+
+    assert read_tree(streamed) == read_tree(rendered)
+
+
+def test_streaming_unsupported_formatter():
+    with pytest.raises(ValueError):
+        EcoreGenerator(formatter='autopep8', streaming=True)
@@ -1,5 +1,6 @@
 """Copy of the original static library module tests."""
 import importlib
+import sys
 
 import pytest
 
@@ -9,13 +10,17 @@ from pyecore.utils import DynamicEPackage
 from pyecoregen.ecore import EcoreGenerator
 
 
-@pytest.fixture(scope='module')
-def generated_library(pygen_output_dir):
+@pytest.fixture(scope='module', params=[False, True], ids=['default', 'compact'])
+def generated_library(pygen_output_dir, request):
     rset = ResourceSet()
     resource = rset.get_resource(URI('input/library.ecore'))
     library_model = resource.contents[0]
-    generator = EcoreGenerator()
+    generator = EcoreGenerator(compact_classes=request.param)
     generator.generate(library_model, pygen_output_dir)
+
+    # forget the library generated for the previous parameter:
+    for name in [n for n in sys.modules if n == 'library' or n.startswith('library.')]:
+        del sys.modules[name]
     return importlib.import_module('library')
 
 
@@ -47,6 +52,15 @@ def test_get_nonexisting_EClassifier_generated(generated_library):
     assert not generated_library.getEClassifier('NBook')
 
 
+def test_package_classifiers_generated(generated_library):
+    assert [c.name for c in generated_library.eClass.eClassifiers] == [
+        'Employee', 'Library', 'Writer', 'Book', 'BookCategory'
+    ]
+    assert generated_library.BookCategory.ePackage is generated_library.eClass
+    # the metaclasses of the Ecore types stay in the Ecore package:
+    assert Ecore.EEnum.eClass.ePackage is Ecore.eClass
+
+
 def test_create_book_generated(generated_library):
     book = generated_library.Book()
     assert book and isinstance(book, Ecore.EObject)
@@ -98,7 +112,8 @@ def test_library_econtents_generated(generated_library):
 
 def test_instance_eisset_generated(generated_library):
     smith = generated_library.Writer()
-    assert smith._isset == set()
+    # `_isset` is a set in older pyecore versions and a dict in newer ones:
+    assert set(smith._isset) == set()
     smith.name = 'SmithIsMyName'
     assert generated_library.Writer.name in smith._isset
     assert smith.eIsSet(generated_library.Writer.name)
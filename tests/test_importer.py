@@ -0,0 +1,99 @@
+import os
+import shutil
+import sys
+import traceback
+from unittest import mock
+
+import pytest
+
+from pyecoregen import importer
+from pyecoregen.ecore import EcoreGenerator
+from pyecoregen.importer import EcoreFinder, install, module_name
+
+
+@pytest.fixture
+def ecore_folder(cwd_module_dir, tmpdir):
+    for name in ('library.ecore', 'A.ecore', 'B.ecore', 'C.ecore', 'D.ecore', 'E.ecore'):
+        shutil.copy(os.path.join('input', name), str(tmpdir))
+    return tmpdir
+
+
+def forget_generated_modules():
+    for name in [n for n in sys.modules if n.split('.')[0] in ('library', 'a', 'b', 'c', 'd')]:
+        del sys.modules[name]
+
+
+@pytest.fixture
+def finders(monkeypatch):
+    """Removes installed finders, generated modules and compiled code around the test."""
+    monkeypatch.setattr(importer, '_compiled', {})
+    forget_generated_modules()
+    installed = []
+    yield installed
+    for finder in installed:
+        sys.meta_path.remove(finder)
+    forget_generated_modules()
+
+
+def test__module_name():
+    assert module_name(os.path.join('a', '__init__.py')) == 'a'
+    assert module_name(os.path.join('a', 'b', 'b.py')) == 'a.b.b'
+    assert module_name(os.path.join('a', 'a_mixins.py.skeleton')) is None
+
+
+def test__ecore_finder__import(ecore_folder, finders):
+    finders.append(install([str(ecore_folder.join('library.ecore'))]))
+    import library
+
+    book = library.Book(title='Ecore')
+    assert book.title == 'Ecore'
+    assert library.getEClassifier('Writer') is library.Writer
+    assert library.__file__ == str(ecore_folder.join('library.ecore', 'library', '__init__.py'))
+    # no code is written:
+    assert sorted(p.basename for p in ecore_folder.listdir()) == [
+        'A.ecore', 'B.ecore', 'C.ecore', 'D.ecore', 'E.ecore', 'library.ecore'
+    ]
+
+
+def test__ecore_finder__dependencies(ecore_folder, finders):
+    finders.append(install([str(ecore_folder.join('A.ecore'))]))
+    import a
+    import b
+
+    assert a.A.b.eType is b.B
+
+
+def test__ecore_finder__traceback_shows_source(ecore_folder, finders):
+    finders.append(install([str(ecore_folder.join('library.ecore'))]))
+    import library
+
+    # the generated constructor sets the title, which has the wrong type:
+    with pytest.raises(Exception) as info:
+        library.Book(title=42)
+    text = ''.join(traceback.format_tb(info.tb))
+    assert os.path.join('library.ecore', 'library', 'library.py') in text
+    assert 'self.title = title' in text
+
+
+def test__ecore_finder__unknown_module(ecore_folder, finders):
+    finder = EcoreFinder([str(ecore_folder.join('library.ecore'))])
+    assert finder.find_spec('json') is None
+    assert finder.find_spec('library.unknown') is None
+    assert finder.find_spec('library.library').origin.endswith('library.py')
+
+
+def test__ecore_finder__compiled_code_reused(ecore_folder, finders):
+    path = str(ecore_folder.join('library.ecore'))
+    first = EcoreFinder([path])
+    assert first.find_spec('library')
+
+    # a finder of the same metamodel with the same settings does not generate again:
+    generator = EcoreGenerator(with_dependencies=True, formatter='raw')
+    with mock.patch.object(generator, 'generate_sources') as generate_sources:
+        second = EcoreFinder([path], generator)
+        assert second.find_spec('library').loader.module is first.find_spec('library').loader.module
+    assert not generate_sources.called
+
+    # with other settings, the code is generated again:
+    third = EcoreFinder([path], EcoreGenerator(compact_classes=True, formatter='raw'))
+    assert third.find_spec('library').loader.module is not first.find_spec('library').loader.module
@@ -0,0 +1,48 @@
+import os
+
+from pyecore.ecore import EPackage, EClass, EEnum, EReference
+from pyecoregen.index import ModelIndex
+
+
+def create_model():
+    # ThePackage
+    #   Class1
+    #   SubPackage
+    #     Class2 -> Class1
+    #     Class3 -> Class2
+    #     MyEnum
+    package = EPackage('ThePackage')
+    subpackage = EPackage('SubPackage')
+    package.eSubpackages.append(subpackage)
+    class1 = EClass('Class1')
+    class2 = EClass('Class2', superclass=(class1,))
+    class3 = EClass('Class3', superclass=(class2,))
+    enum = EEnum('MyEnum', literals=['A', 'B'])
+    package.eClassifiers.append(class1)
+    subpackage.eClassifiers.extend([class2, class3, enum])
+    class3.eStructuralFeatures.append(EReference('ref', class1))
+    return package
+
+
+def test__model_index__contents():
+    package = create_model()
+    subpackage = package.eSubpackages[0]
+    index = ModelIndex(package)
+    assert index.contents(package, EPackage) == [subpackage]
+    assert index.contents(subpackage, EReference) == [subpackage.eClassifiers[1].eReferences[0]]
+    assert index.contents(EPackage('other'), EPackage) is None
+
+
+def test__model_index__packages():
+    package = create_model()
+    subpackage = package.eSubpackages[0]
+    index = ModelIndex(package)
+    assert index.package_path(subpackage) == ('ThePackage', 'SubPackage')
+    assert index.folder_path(subpackage) == os.path.join('ThePackage', 'SubPackage')
+    assert index.folder_path(EPackage('other')) is None
+
+
+def test__model_index__subpackage_model():
+    subpackage = create_model().eSubpackages[0]
+    index = ModelIndex(subpackage)
+    assert index.package_path(subpackage) == ('ThePackage', 'SubPackage')
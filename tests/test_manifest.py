@@ -0,0 +1,129 @@
+import os
+
+from pyecore.ecore import EPackage, EClass, EAttribute, EReference, EString
+from pyecoregen.ecore import EcoreGenerator
+from pyecoregen.manifest import Manifest, package_digests, qualified_name, MANIFEST_FILENAME
+
+
+def create_model():
+    # ThePackage
+    #   Class1
+    #   SubPackage
+    #     Class2
+    package = EPackage('ThePackage')
+    subpackage = EPackage('SubPackage')
+    package.eSubpackages.append(subpackage)
+    class1 = EClass('Class1')
+    class2 = EClass('Class2')
+    package.eClassifiers.append(class1)
+    subpackage.eClassifiers.append(class2)
+    class1.eStructuralFeatures.append(EAttribute('att', EString))
+    class2.eStructuralFeatures.append(EReference('ref', class1))
+    return package
+
+
+def test__qualified_name():
+    package = create_model()
+    subpackage = package.eSubpackages[0]
+    assert qualified_name(package) == 'ThePackage'
+    assert qualified_name(subpackage) == 'ThePackage.SubPackage'
+    assert qualified_name(subpackage.eClassifiers[0]) == 'ThePackage.SubPackage.Class2'
+
+
+def test__package_digests__stable():
+    assert list(package_digests(create_model()).values()) == \
+        list(package_digests(create_model()).values())
+
+
+def test__package_digests__salt():
+    model = create_model()
+    assert package_digests(model, 'a')[model] != package_digests(model, 'b')[model]
+
+
+def test__package_digests__change_propagates_to_root():
+    model = create_model()
+    subpackage = model.eSubpackages[0]
+    digests = package_digests(model)
+
+    subpackage.eClassifiers[0].eStructuralFeatures.append(EAttribute('other', EString))
+    changed = package_digests(model)
+
+    assert changed[subpackage] != digests[subpackage]
+    assert changed[model] != digests[model]
+
+
+def test__package_digests__dependency_rename():
+    model = create_model()
+    subpackage = model.eSubpackages[0]
+    digests = package_digests(model)
+
+    # Class2 references Class1, so renaming it changes the generated code of the subpackage:
+    model.eClassifiers[0].name = 'Renamed'
+    changed = package_digests(model)
+
+    assert changed[subpackage] != digests[subpackage]
+
+
+def test__manifest__roundtrip(tmpdir):
+    manifest = Manifest(str(tmpdir), 'salt')
+    assert not manifest.is_current('pkg', 'abc')
+    manifest.update('pkg', 'abc')
+    manifest.save()
+
+    assert Manifest(str(tmpdir), 'salt').is_current('pkg', 'abc')
+    assert not Manifest(str(tmpdir), 'other').is_current('pkg', 'abc')
+
+
+def test__manifest__corrupt_file(tmpdir):
+    tmpdir.join(MANIFEST_FILENAME).write('{no json')
+    assert Manifest(str(tmpdir)).packages == {}
+
+
+def test__incremental_generation(tmpdir):
+    model = create_model()
+    model.eSubpackages.append(EPackage('OtherPackage'))
+    outfolder = str(tmpdir)
+    generator = EcoreGenerator(incremental=True)
+    generator.generate(model, outfolder)
+
+    paths = [
+        os.path.join(outfolder, 'ThePackage', 'OtherPackage', 'OtherPackage.py'),
+        os.path.join(outfolder, 'ThePackage', 'SubPackage', 'SubPackage.py'),
+    ]
+    assert os.path.exists(os.path.join(outfolder, MANIFEST_FILENAME))
+    for path in paths:
+        os.utime(path, (0, 0))
+
+    # no-op regeneration does not touch any file:
+    generator.generate(model, outfolder)
+    assert [os.path.getmtime(p) for p in paths] == [0, 0]
+
+    # only the changed subpackage (and its root) is regenerated:
+    model.eSubpackages[0].eClassifiers.append(EClass('Class3'))
+    generator.generate(model, outfolder)
+    assert os.path.getmtime(paths[0]) == 0
+    assert os.path.getmtime(paths[1]) != 0
+    assert 'Class3' in open(paths[1]).read()
+
+
+def test__incremental_generation__missing_file(tmpdir):
+    model = create_model()
+    outfolder = str(tmpdir)
+    generator = EcoreGenerator(incremental=True)
+    generator.generate(model, outfolder)
+
+    path = os.path.join(outfolder, 'ThePackage', 'ThePackage.py')
+    os.remove(path)
+    generator.generate(model, outfolder)
+    assert os.path.exists(path)
+
+
+def test__incremental_generation__changed_settings(tmpdir):
+    model = create_model()
+    outfolder = str(tmpdir)
+    EcoreGenerator(incremental=True).generate(model, outfolder)
+
+    path = os.path.join(outfolder, 'ThePackage', '__init__.py')
+    os.utime(path, (0, 0))
+    EcoreGenerator(incremental=True, auto_register_package=True).generate(model, outfolder)
+    assert os.path.getmtime(path) != 0
@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+from pyecore.resources import ResourceSet, URI
+from pyecoregen.ecore import EcoreGenerator
+from pyecoregen.parallel import parallel_supported
+
+
+def read_tree(folder):
+    files = {}
+    for dirpath, _, filenames in os.walk(folder):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            with open(path, 'rb') as file:
+                files[os.path.relpath(path, folder)] = file.read()
+    return files
+
+
+@pytest.mark.skipif(not parallel_supported(), reason='requires fork start method')
+@pytest.mark.parametrize('ecore_file', ['library.ecore', 'A.ecore'])
+def test_parallel_generation_identical(ecore_file, cwd_module_dir, tmpdir):
+    rset = ResourceSet()
+    model = rset.get_resource(URI(os.path.join('input', ecore_file))).contents[0]
+    serial = str(tmpdir.mkdir('serial'))
+    parallel = str(tmpdir.mkdir('parallel'))
+
+    EcoreGenerator(with_dependencies=True, user_module='user').generate(model, serial)
+    EcoreGenerator(with_dependencies=True, user_module='user', jobs=3).generate(model, parallel)
+
+    serial_files = read_tree(serial)
+    assert serial_files
+    assert read_tree(parallel) == serial_files
@@ -0,0 +1,80 @@
+import logging
+import os
+from unittest import mock
+
+import pytest
+
+from pyecore.resources import ResourceSet, URI
+from pyecoregen.ecore import EcoreGenerator
+from pyecoregen.parallel import parallel_supported
+from pyecoregen.profiling import Profile
+
+
+def test__profile__report():
+    profile = Profile()
+    profile.add('index', 1.0)
+    profile.add('render', 2.0, 'Task', 'a')
+    profile.add('render', 3.0, 'Task', 'b')
+    profile.add('write', 0.5, 'Task', 'a')
+    with profile.measure('format', 'Task', 'b'):
+        pass
+
+    report = profile.report()
+    assert report['phases']['render'] == 5.0
+    assert report['tasks']['Task']['render'] == 5.0
+    assert report['packages']['a'] == {'render': 2.0, 'write': 0.5}
+    assert list(report['packages']) == ['b', 'a']
+    assert len(report['records']) == 5
+
+
+def test__profile__save(tmpdir):
+    profile = Profile()
+    profile.add('render', 2.0, 'Task', 'a')
+    path = str(tmpdir.join('profile.json'))
+    profile.save(path)
+    assert os.path.exists(path)
+
+
+@pytest.mark.parametrize('jobs', [
+    1,
+    pytest.param(2, marks=pytest.mark.skipif(not parallel_supported(),
+                                             reason='requires fork start method')),
+])
+def test_generator_profile(jobs, cwd_module_dir, tmpdir, caplog):
+    model = ResourceSet().get_resource(URI(os.path.join('input', 'A.ecore'))).contents[0]
+    generator = EcoreGenerator(with_dependencies=True, jobs=jobs)
+    with caplog.at_level(logging.INFO, logger='pyecoregen.profiling'):
+        generator.generate(model, str(tmpdir))
+
+    report = generator.profile.report()
+    assert set(report['packages']) == {'a', 'b', 'c', 'd'}
+    for phases in report['packages'].values():
+        # one init and one module file per package:
+        assert set(phases) == {'context', 'render', 'format', 'write'}
+    assert len([r for r in generator.profile.records if r.phase == 'render']) == 8
+    # loading the dependencies is not counted as indexing:
+    assert {'dependencies', 'index'} <= set(generator.profile.report()['phases'])
+    assert any('Phase durations' in r.getMessage() for r in caplog.records)
+
+
+def test__profile__report_start():
+    profile = Profile()
+    profile.add('index', 1.0)
+    profile.add('index', 2.0)
+    assert profile.report(1)['phases'] == {'index': 2.0}
+    profile.clear()
+    assert profile.records == []
+
+
+def test_generator_profile_logs_each_generation(cwd_module_dir, tmpdir, caplog):
+    model = ResourceSet().get_resource(URI(os.path.join('input', 'library.ecore'))).contents[0]
+    generator = EcoreGenerator(formatter='raw')
+    with mock.patch.object(Profile, 'report', autospec=True,
+                           side_effect=Profile.report) as report:
+        generator.generate(model, str(tmpdir))
+        generator.generate(model, str(tmpdir))
+
+    # the second summary only covers the second generation:
+    first, second = (c[0][1] for c in report.call_args_list)
+    assert first == 0
+    assert second == len(generator.profile.records) // 2
@@ -1,5 +1,8 @@
 """Tests for the various features from the code generation templates."""
 import importlib
+import os
+import subprocess
+import sys
 from unittest import mock
 
 import pytest
@@ -12,8 +15,12 @@ from user_provided.module import MyClassMixin, \
     MyOtherClassMixin  # search path set in test configuration
 
 
-def generate_meta_model(model, output_dir, *, user_module=None, auto_register_package=None):
-    generator = EcoreGenerator(user_module=user_module, auto_register_package=auto_register_package)
+def generate_meta_model(model, output_dir, *, user_module=None, auto_register_package=None,
+                        lazy_imports=False, compact_classes=False, flat_init=False,
+                        bulk_factories=False):
+    generator = EcoreGenerator(user_module=user_module, auto_register_package=auto_register_package,
+                               lazy_imports=lazy_imports, compact_classes=compact_classes,
+                               flat_init=flat_init, bulk_factories=bulk_factories)
     generator.generate(model, output_dir)
     return importlib.import_module(model.name)
 
@@ -70,6 +77,62 @@ def test_top_level_package_with_subpackages(pygen_output_dir):
     assert b.a is a
 
 
+def test_lazy_imports_subpackages(pygen_output_dir):
+    rootpkg = EPackage('lazyroot', nsURI='http://lazyroot')
+    subpkg = EPackage('lazysub', nsURI='http://lazyroot/sub')
+    unusedpkg = EPackage('lazyunused', nsURI='http://lazyroot/unused')
+    cls1 = EClass('A')
+    cls2 = EClass('B')
+    cls1.eStructuralFeatures.append(EReference('b', cls2))
+    cls2.eStructuralFeatures.append(
+        EReference('a', cls1, eOpposite=cls1.findEStructuralFeature('b')))
+    rootpkg.eClassifiers.append(cls1)
+    rootpkg.eSubpackages.extend([subpkg, unusedpkg])
+    subpkg.eClassifiers.append(cls2)
+    unusedpkg.eClassifiers.append(EClass('C'))
+
+    mm = generate_meta_model(rootpkg, pygen_output_dir, auto_register_package=True,
+                             lazy_imports=True)
+
+    # the subpackage referenced by the root is loaded, the unused one is not:
+    assert 'lazyroot.lazysub' in sys.modules
+    assert 'lazyroot.lazyunused' not in sys.modules
+
+    a = mm.A()
+    b = mm.lazysub.B()
+    a.b = b
+    assert b.a is a
+
+    assert [p.name for p in mm.eSubpackages] == ['lazysub', 'lazyunused']
+    assert mm.lazyunused.eSuperPackage is mm.lazyroot
+    assert mm.lazyunused.C.eClass.ePackage is mm.lazyunused.eClass
+    assert {p.name for p in mm.eClass.eSubpackages} == {'lazysub', 'lazyunused'}
+    assert mm.lazyroot.eSubpackages == mm.eSubpackages
+
+
+def test_lazy_imports_circular_packages(pygen_output_dir):
+    pkg1 = EPackage('lazycircular1')
+    pkg2 = EPackage('lazycircular2')
+    cls1 = EClass('A')
+    cls2 = EClass('B')
+    cls1.eStructuralFeatures.append(EReference('b', cls2, upper=-1))
+    cls2.eStructuralFeatures.append(
+        EReference('a', cls1, eOpposite=cls1.findEStructuralFeature('b')))
+    pkg1.eClassifiers.append(cls1)
+    pkg2.eClassifiers.append(cls2)
+
+    generator = EcoreGenerator(lazy_imports=True)
+    generator.generate(pkg1, pygen_output_dir)
+    generator.generate(pkg2, pygen_output_dir)
+    mm2 = importlib.import_module('lazycircular2')
+    mm1 = importlib.import_module('lazycircular1')
+
+    a = mm1.A()
+    b = mm2.B()
+    a.b.append(b)
+    assert b.a is a
+
+
 def test_package_with_enum(pygen_output_dir):
     enumpkg = EPackage('enumpkg')
     enum = EEnum('MyEnum', literals=('X', 'Y', 'Z'))
@@ -101,6 +164,42 @@ def test_classifier_imports(pygen_output_dir):
     assert mm
 
 
+def test_generated_code_independent_of_hash_seed(tmpdir):
+    rootpkg = EPackage('seeded', nsURI='http://seeded', nsPrefix='seeded')
+    ppkg = EPackage('provider')
+    upkg = EPackage('user')
+    rootpkg.eSubpackages.extend([ppkg, upkg])
+
+    # many classifiers imported from the same package, in sets ordered by hash:
+    provided = [EClass('Provided{}'.format(i)) for i in range(10)]
+    enums = [EEnum('Kind{}'.format(i), literals=('A', 'B')) for i in range(5)]
+    ppkg.eClassifiers.extend(provided + enums)
+    for i, supertype in enumerate(provided):
+        user = EClass('User{}'.format(i), superclass=supertype)
+        user.eStructuralFeatures.append(EAttribute('kind', enums[i % len(enums)]))
+        user.eStructuralFeatures.append(EReference('ref', provided[-i - 1]))
+        upkg.eClassifiers.append(user)
+        supertype.eStructuralFeatures.append(EReference('user', user))
+
+    path = str(tmpdir.join('seeded.ecore'))
+    resource = ResourceSet().create_resource(URI(path))
+    resource.append(rootpkg)
+    resource.save()
+
+    def generate(seed, *options):
+        output = tmpdir.join('output-{}'.format(seed), *options)
+        env = dict(os.environ, PYTHONHASHSEED=str(seed))
+        subprocess.check_call([sys.executable, '-m', 'pyecoregen.cli', '-e', path,
+                               '-o', str(output), *options], env=env)
+        return {p.relto(output): p.read_binary() for p in output.visit(fil='*.py')}
+
+    for options in ((), ('--lazy-imports',)):
+        first = generate(1, *options)
+        assert first
+        assert generate(2, *options) == first
+        assert generate(3, *options) == first
+
+
 def test_class_with_features(pygen_output_dir):
     rootpkg = EPackage('class_features')
     class_ = EClass('MyClass')
@@ -243,6 +342,172 @@ def test_pythonic_names(pygen_output_dir):
     assert mm.pass_().else_ == set()
 
 
+def test_compact_classes(pygen_output_dir, tmpdir):
+    rootpkg = EPackage('compact', nsURI='http://compact', nsPrefix='compact')
+    base = EClass('Base')
+    base.eStructuralFeatures.append(EAttribute('name', EString))
+    derived = EClass('Derived', superclass=(base,))
+    derived.eStructuralFeatures.append(EAttribute('size', EInt))
+    derived.eStructuralFeatures.append(EAttribute('tags', EString, upper=-1))
+    rootpkg.eClassifiers.extend([base, derived])
+
+    mm = generate_meta_model(rootpkg, pygen_output_dir, compact_classes=True)
+    assert set(mm.Derived._compact_attributes) == {'name', 'size'}
+
+    d = mm.Derived(name='x', tags=['a'])
+    assert d.__dict__['name'] == 'x'  # no value container
+    assert d.name == 'x'
+    assert d.eIsSet('name') and not d.eIsSet('size')
+    assert d.size == 0
+
+    with pytest.raises(TypeError):
+        d.name = 42
+
+    observer = mock.MagicMock()
+    d.listeners.append(observer)
+    d.size = 5
+    notification = observer.notifyChanged.call_args[0][0]
+    assert (notification.old, notification.new) == (0, 5)
+
+    # XMI round trip:
+    path = str(tmpdir.join('instance.xmi'))
+    rset = ResourceSet()
+    rset.metamodel_registry[mm.nsURI] = mm
+    resource = rset.create_resource(URI(path))
+    resource.append(d)
+    resource.save()
+    loaded = ResourceSet()
+    loaded.metamodel_registry[mm.nsURI] = mm
+    copy = loaded.get_resource(URI(path)).contents[0]
+    assert (copy.name, copy.size, list(copy.tags)) == ('x', 5, ['a'])
+
+    del d.name
+    assert d.name is None
+
+
+def test_flat_init(pygen_output_dir):
+    rootpkg = EPackage('flatinit')
+    a, b, c = EClass('A'), EClass('B'), EClass('C')
+    b.eSuperTypes.append(a)
+    c.eSuperTypes.append(b)
+    a.eStructuralFeatures.append(EAttribute('name', EString))
+    b.eStructuralFeatures.append(EAttribute('values', EInt, upper=-1))
+    c.eStructuralFeatures.append(EReference('parent', a))
+    rootpkg.eClassifiers.extend([a, b, c])
+
+    mm = generate_meta_model(rootpkg, pygen_output_dir, flat_init=True)
+
+    parent = mm.A(name='parent')
+    instance = mm.C(name='x', values=[1, 2], parent=parent)
+    assert (instance.name, list(instance.values), instance.parent) == ('x', [1, 2], parent)
+    assert not mm.C(name='y').eIsSet('parent')
+
+    # like the chained constructors, unknown keywords are rejected:
+    with pytest.raises(TypeError):
+        mm.C(typo='x')
+
+    # the constructors of the base classes are not called:
+    with mock.patch.object(mm.B, '__init__') as init:
+        mm.C()
+    assert not init.called
+
+
+def test_bulk_factories(pygen_output_dir):
+    rootpkg = EPackage('bulkfactories')
+    a, b, c = EClass('A'), EClass('B'), EClass('C')
+    b.eSuperTypes.append(a)
+    a.eStructuralFeatures.append(EAttribute('name', EString))
+    b.eStructuralFeatures.append(EAttribute('values', EInt, upper=-1))
+    b.eStructuralFeatures.append(EReference('parent', a))
+    rootpkg.eClassifiers.extend([a, b, c])
+
+    mm = generate_meta_model(rootpkg, pygen_output_dir, bulk_factories=True)
+
+    parents = mm.A.create_many([('p0',), ('p1',)])
+    assert [p.name for p in parents] == ['p0', 'p1']
+
+    instances = mm.B.create_many([('b0', [1, 2], parents[0]), (None, None, parents[1])])
+    assert [i.name for i in instances] == ['b0', None]
+    assert [list(i.values) for i in instances] == [[1, 2], []]
+    assert [i.parent for i in instances] == parents
+    assert not instances[1].eIsSet('name')
+
+    instances = mm.B.create_many(name=['b0', 'b1'], parent=parents)
+    assert [(i.name, i.parent) for i in instances] == [('b0', parents[0]), ('b1', parents[1])]
+    with pytest.raises(TypeError):
+        mm.B.create_many(nme=['b0'])
+
+    assert len(mm.C.create_many([(), ()])) == 2
+
+
+def test_bulk_factories_abstract(pygen_output_dir):
+    rootpkg = EPackage('bulkfactoriesabstract')
+    a, b = EClass('A', abstract=True), EClass('B')
+    b.eSuperTypes.append(a)
+    a.eStructuralFeatures.append(EAttribute('name', EString))
+    rootpkg.eClassifiers.extend([a, b])
+
+    mm = generate_meta_model(rootpkg, pygen_output_dir, bulk_factories=True)
+
+    # like the constructor, the factory refuses to create instances of abstract classes:
+    with pytest.raises(TypeError):
+        mm.A.create_many([('a',)])
+    instance, = mm.B.create_many([('b',)])
+    assert instance.name == 'b'
+
+
+def test_bulk_factories_shadowing_names(pygen_output_dir):
+    rootpkg = EPackage('bulkfactoriesshadowing')
+    a = EClass('A')
+    # `notify` cannot be a feature name, as it clashes with `EObject.notify`:
+    for name in ('cls', 'rows', 'columns'):
+        a.eStructuralFeatures.append(EAttribute(name, EString))
+    rootpkg.eClassifiers.append(a)
+
+    mm = generate_meta_model(rootpkg, pygen_output_dir, bulk_factories=True)
+
+    first, second = mm.A.create_many([('c', 'r', 'o'), ('c2', None, None)])
+    assert (first.cls, first.rows, first.columns) == ('c', 'r', 'o')
+    assert second.cls == 'c2'
+
+
+def test_bulk_factories_notify(pygen_output_dir):
+    rootpkg = EPackage('bulkfactoriesnotify')
+    a = EClass('A')
+    a.eStructuralFeatures.append(EAttribute('name', EString))
+    rootpkg.eClassifiers.append(a)
+
+    mm = generate_meta_model(rootpkg, pygen_output_dir, bulk_factories=True)
+
+    with mock.patch.object(mm.A, 'notify') as notify:
+        instance, = mm.A.create_many([('a',)], notify=False)
+    assert not notify.called
+    assert instance.name == 'a'
+    assert 'notify' not in instance.__dict__
+
+    with mock.patch.object(mm.A, 'notify') as notify:
+        mm.A.create_many([('a',)])
+    assert notify.called
+
+
+def test_bulk_factories_user_module(pygen_output_dir):
+    rootpkg = EPackage('bulkfactoriesusermodule')
+    c1 = EClass('MyClass')
+    c1.eStructuralFeatures.append(EAttribute('any', EString, derived=True))
+    c2 = EClass('MyOtherClass')
+    c2.eStructuralFeatures.append(EAttribute('other', EString, derived=True))
+    c2.eSuperTypes.append(c1)
+    rootpkg.eClassifiers.extend([c1, c2])
+
+    mm = generate_meta_model(rootpkg, pygen_output_dir, user_module='user_provided.module',
+                             bulk_factories=True)
+
+    # instances are created by the constructor, which calls the mixins:
+    instance, = mm.MyOtherClass.create_many([('any', 'other')])
+    assert isinstance(instance, MyOtherClassMixin)
+    instance.mock_other.assert_called_with('other')
+
+
 def test_attribute_with_feature_id(pygen_output_dir):
     rootpkg = EPackage('id_attribute')
     c1 = EClass('MyClass')
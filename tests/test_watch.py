@@ -0,0 +1,91 @@
+import os
+import shutil
+
+import pytest
+
+from pyecoregen.ecore import EcoreGenerator
+from pyecoregen.watch import Watcher
+
+
+@pytest.fixture
+def watcher(cwd_module_dir, tmpdir):
+    for name in 'ABCDE':
+        shutil.copy(os.path.join('input', name + '.ecore'), str(tmpdir))
+    generator = EcoreGenerator(with_dependencies=True, formatter='fast')
+    watcher = Watcher(generator, [str(tmpdir.join('A.ecore'))], str(tmpdir.join('output')))
+    watcher.generate()
+    return watcher
+
+
+def edit(path, old, new):
+    with open(path) as file:
+        content = file.read()
+    with open(path, 'w') as file:
+        file.write(content.replace(old, new))
+    # make sure the change is detected on file systems with coarse timestamps:
+    mtime = os.stat(path).st_mtime_ns + 10 ** 9
+    os.utime(path, ns=(mtime, mtime))
+
+
+def resources(watcher):
+    return {os.path.basename(r.uri.plain): r for r in watcher.resource_set.resources.values()}
+
+
+def test_watcher_poll_unchanged(watcher):
+    assert watcher.generator.incremental
+    assert not watcher.changed_resources()
+    assert not watcher.poll()
+
+
+def test_watcher_poll_changed(watcher, tmpdir):
+    loaded = resources(watcher)
+    edit(str(tmpdir.join('C.ecore')), 'name="C"/>',
+         'name="C"/>\n  <eClassifiers xsi:type="ecore:EClass" name="C2"/>')
+
+    assert watcher.poll()
+
+    # the changed file and the files using it are reloaded, the others are kept:
+    reloaded = resources(watcher)
+    assert [n for n in sorted(loaded) if reloaded[n] is not loaded[n]] == ['A.ecore', 'B.ecore',
+                                                                           'C.ecore']
+    with open(str(tmpdir.join('output', 'c', 'c.py'))) as file:
+        assert 'class C2(' in file.read()
+
+    # only the changed package is regenerated:
+    written = [os.path.relpath(p, str(tmpdir.join('output')))
+               for p in watcher.generator.writer.written]
+    assert sorted(written) == [os.path.join('c', '__init__.py'), os.path.join('c', 'c.py')]
+    assert not watcher.poll()
+
+
+def test_watcher_profile_cleared(watcher, tmpdir):
+    path = str(tmpdir.join('C.ecore'))
+    edit(path, 'name="C"/>', 'name="C"/>\n  <eClassifiers xsi:type="ecore:EClass" name="C2"/>')
+    assert watcher.poll()
+    records = len(watcher.generator.profile.records)
+
+    edit(path, 'name="C2"/>', 'name="C3"/>')
+    assert watcher.poll()
+
+    # the profile only holds the records of the last generation:
+    assert len(watcher.generator.profile.records) == records
+    assert sum(r.phase == 'index' for r in watcher.generator.profile.records) == 1
+
+
+def test_watcher_poll_invalid_file(watcher, tmpdir):
+    path = str(tmpdir.join('C.ecore'))
+    edit(path, 'name="C"/>', 'name="C">')
+
+    assert watcher.poll()
+    assert not watcher.poll()
+
+    edit(path, 'name="C">', 'name="C"/>\n  <eClassifiers xsi:type="ecore:EClass" name="C2"/>')
+    assert watcher.poll()
+    with open(str(tmpdir.join('output', 'c', 'c.py'))) as file:
+        assert 'class C2(' in file.read()
+
+
+def test_watcher_run(watcher, tmpdir):
+    watcher.interval = 0
+    watcher.run(polls=2)
+    assert os.path.exists(str(tmpdir.join('output', 'a', 'a.py')))
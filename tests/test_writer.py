@@ -0,0 +1,111 @@
+import os
+
+import pytest
+
+from pyecore.resources import ResourceSet, URI
+from pyecoregen.ecore import EcoreGenerator
+from pyecoregen.writer import MemoryWriter, Writer, split_lines, write_atomic, write_if_changed
+
+
+@pytest.mark.parametrize('chunks, lines', [
+    ([], []),
+    (['a\nb\n'], ['a', 'b']),
+    (['a', 'b\n', '\nc'], ['ab', '', 'c']),
+    (['a\n', '', '\n'], ['a', '']),
+])
+def test__split_lines(chunks, lines):
+    assert list(split_lines(chunks)) == lines
+
+
+def test__write_atomic(tmpdir):
+    path = str(tmpdir.join('file.py'))
+    assert write_atomic(path, ['x = 1\n', 'y = 2\n'])
+    assert not write_atomic(path, ['x = 1\n', 'y = 2\n'])
+    assert write_atomic(path, ['z = 3\n'])
+
+    with open(path) as file:
+        assert file.read() == 'z = 3\n'
+    assert os.listdir(str(tmpdir)) == ['file.py']
+
+
+def test__write_atomic__failure(tmpdir):
+    path = str(tmpdir.join('file.py'))
+    write_atomic(path, ['x = 1\n'])
+
+    def chunks():
+        yield 'y = 2\n'
+        raise RuntimeError('rendering failed')
+
+    with pytest.raises(RuntimeError):
+        write_atomic(path, chunks())
+
+    # the previous file is kept and the temporary file removed:
+    with open(path) as file:
+        assert file.read() == 'x = 1\n'
+    assert os.listdir(str(tmpdir)) == ['file.py']
+
+
+def test__write_if_changed(tmpdir):
+    path = str(tmpdir.join('file.py'))
+    assert write_if_changed(path, 'x = 1\n')
+    os.utime(path, (0, 0))
+
+    assert not write_if_changed(path, 'x = 1\n')
+    assert os.stat(path).st_mtime == 0
+
+    assert write_if_changed(path, 'x = 2\n')
+    assert os.stat(path).st_mtime != 0
+
+
+def test__writer__counts(tmpdir):
+    writer = Writer()
+    first, second = str(tmpdir.join('first.py')), str(tmpdir.join('second.py'))
+    writer.write(first, 'x = 1\n')
+    writer.write(first, 'x = 1\n')
+    writer.stream(second, ['x = ', '1\n'])
+    writer.stream(second, ['x = 1\n'])
+
+    assert writer.written == [first, second]
+    assert writer.unchanged == [first, second]
+
+
+def test__writer__creates_folder(tmpdir):
+    path = str(tmpdir.join('package', 'module.py'))
+    Writer().write(path, 'x = 1\n')
+    assert os.path.isfile(path)
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test__memory_writer__generate_sources(streaming, cwd_module_dir, tmpdir, monkeypatch):
+    model = ResourceSet().get_resource(URI('input/library.ecore')).contents[0]
+    generator = EcoreGenerator(formatter='fast', streaming=streaming, incremental=True)
+    monkeypatch.chdir(str(tmpdir))
+    sources = generator.generate_sources(model)
+
+    assert set(sources) == {os.path.join('library', '__init__.py'),
+                            os.path.join('library', 'library.py')}
+    assert 'class Book(' in sources[os.path.join('library', 'library.py')]
+    assert isinstance(generator.writer, MemoryWriter)
+    # nothing is written, not even a manifest:
+    assert not tmpdir.listdir()
+
+    generator.generate(model, str(tmpdir.join('output')))
+    for path, code in sources.items():
+        assert tmpdir.join('output', path).read() == code
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_regeneration_keeps_unchanged_files(streaming, cwd_module_dir, tmpdir):
+    model = ResourceSet().get_resource(URI('input/library.ecore')).contents[0]
+    generator = EcoreGenerator(formatter='fast', streaming=streaming)
+    generator.generate(model, str(tmpdir))
+    assert len(generator.writer.written) == 2
+
+    paths = generator.writer.written
+    for path in paths:
+        os.utime(path, (0, 0))
+    generator.generate(model, str(tmpdir))
+
+    assert not generator.writer.written
+    assert generator.writer.unchanged == paths
+    assert all(os.stat(p).st_mtime == 0 for p in paths)